@@ -0,0 +1,199 @@
+from array import array
+import numpy as np
+
+
+class CompactSuffixTree:
+    """
+    A suffix tree stored as a struct of arrays instead of a dictionary of edge lists, built with Ukkonen's
+    algorithm. Each node is an integer index into five arrays, so a node takes 20 bytes (40 for words of 2^30 or more
+    characters) and a tree of a random 10^7 character DNA word takes about 330 MB.
+
+    Nodes 0 to n - 1 are the leaves (node i is the leaf of the suffix starting at i), node n is unused and node n + 1
+    is the root. Internal nodes follow in the order they were created. The children of a node form a linked list:
+    first_child[node], then next_sibling[child] until -1.
+
+    Properties:
+        word: The word the tree was built from.
+
+        n: The length of the word.
+
+        root: The root node.
+
+        num_nodes: The number of node slots in the arrays.
+
+        first_child: The first child of each node (-1 for leaves).
+
+        next_sibling: The next child of the same parent (-1 for the last child).
+
+        edge_start: The start in word of the label of the edge into each node.
+
+        edge_length: The length of the label of the edge into each node.
+
+        suffix_link: The suffix link of each internal node (the node of the same path without its first character).
+    """
+    def __init__(self, word: str):
+        self.word = word
+        self.n = len(word)
+        self.root = self.n + 1
+        self.BuildUkkonen()
+
+    def BuildUkkonen(self):
+        """
+        Builds the tree online with Ukkonen's algorithm. The characters are added one at a time, and the active point
+        (active node, active edge, active length) marks where the next suffix has to be extended. Suffix links jump
+        from one internal node to the node of the next shorter suffix, and leaf edges are left open until the end, so
+        every suffix is extended in amortised O(1) time and the whole tree takes O(n) time.
+
+        A terminator that matches no character is added while building so that every suffix ends at a leaf. Suffixes
+        that would otherwise end inside the tree (when word does not end with a unique character) end on a zero
+        length edge. The leaf of the empty suffix is left out of the tree.
+        """
+        n, root = self.n, self.root
+        text = array("i", map(ord, self.word))
+        text.append(-1)  # The terminator.
+        max_nodes = 2 * n + 3  # n + 1 leaves, the root and at most n internal nodes.
+        typecode = "i" if max_nodes < 2**31 else "q"
+        first_child = array(typecode, [-1]) * max_nodes
+        next_sibling = array(typecode, [-1]) * max_nodes
+        edge_start = array(typecode, [0]) * max_nodes
+        edge_length = array(typecode, [0]) * max_nodes  # Only set for internal nodes while building.
+        suffix_link = array(typecode, [root]) * max_nodes
+        next_node = root + 1
+
+        active_node, active_edge, active_length = root, 0, 0
+        remainder = 0  # The number of suffixes still to be added explicitly.
+        for i in range(n + 1):
+            letter = text[i]
+            remainder += 1
+            last_new_node = -1  # The last internal node created in this phase, waiting for its suffix link.
+            while remainder > 0:
+                if active_length == 0:
+                    active_edge = i
+                edge_letter = text[active_edge]
+                previous, child = -1, first_child[active_node]
+                while child != -1 and text[edge_start[child]] != edge_letter:
+                    previous, child = child, next_sibling[child]
+
+                if child == -1:
+                    leaf = i - remainder + 1
+                    edge_start[leaf] = i
+                    next_sibling[leaf] = first_child[active_node]
+                    first_child[active_node] = leaf
+                    if last_new_node != -1:
+                        suffix_link[last_new_node] = active_node
+                        last_new_node = -1
+                else:
+                    length = edge_length[child] if child > n else i + 1 - edge_start[child]
+                    if active_length >= length:  # Walk down to the child.
+                        active_edge += length
+                        active_length -= length
+                        active_node = child
+                        continue
+                    if text[edge_start[child] + active_length] == letter:  # The suffix is already in the tree.
+                        if last_new_node != -1 and active_node != root:
+                            suffix_link[last_new_node] = active_node
+                        active_length += 1
+                        break
+
+                    split = next_node
+                    next_node += 1
+                    edge_start[split] = edge_start[child]
+                    edge_length[split] = active_length
+                    next_sibling[split] = next_sibling[child]
+                    if previous == -1:
+                        first_child[active_node] = split
+                    else:
+                        next_sibling[previous] = split
+                    edge_start[child] += active_length
+                    if child > n:
+                        edge_length[child] -= active_length
+                    leaf = i - remainder + 1
+                    edge_start[leaf] = i
+                    next_sibling[leaf] = -1
+                    first_child[split] = child
+                    next_sibling[child] = leaf
+                    if last_new_node != -1:
+                        suffix_link[last_new_node] = split
+                    last_new_node = split
+
+                remainder -= 1
+                if active_node == root and active_length > 0:
+                    active_length -= 1
+                    active_edge = i - remainder + 1
+                elif active_node != root:
+                    active_node = suffix_link[active_node]
+
+        # The leaf of the empty suffix is always the first child of the root.
+        if first_child[root] == n:
+            first_child[root] = next_sibling[n]
+        else:
+            previous = first_child[root]
+            while next_sibling[previous] != n:
+                previous = next_sibling[previous]
+            next_sibling[previous] = next_sibling[n]
+        for leaf in range(n):
+            edge_length[leaf] = n - edge_start[leaf]  # Leaf edges stop before the terminator.
+
+        dtype = np.int32 if typecode == "i" else np.int64
+        self.num_nodes = next_node
+        self.first_child = np.frombuffer(first_child, dtype=dtype)[:next_node].copy()
+        self.next_sibling = np.frombuffer(next_sibling, dtype=dtype)[:next_node].copy()
+        self.edge_start = np.frombuffer(edge_start, dtype=dtype)[:next_node].copy()
+        self.edge_length = np.frombuffer(edge_length, dtype=dtype)[:next_node].copy()
+        self.suffix_link = np.frombuffer(suffix_link, dtype=dtype)[:next_node].copy()
+
+    def IsLeaf(self, node: int) -> bool:
+        return node < self.n
+
+    def Children(self, node: int) -> list[int]:
+        """
+        Returns the children of a node.
+        """
+        children = []
+        child = int(self.first_child[node])
+        while child != -1:
+            children.append(child)
+            child = int(self.next_sibling[child])
+        return children
+
+    def Child(self, node: int, letter: str) -> int:
+        """
+        Returns the child of a node whose edge label starts with a letter, or -1 if there is none.
+        """
+        for child in self.Children(node):
+            if self.edge_length[child] > 0 and self.word[self.edge_start[child]] == letter:
+                return child
+        return -1
+
+    def EdgeLabel(self, node: int) -> str:
+        """
+        Returns the label of the edge into a node.
+        """
+        start = int(self.edge_start[node])
+        return self.word[start : start + int(self.edge_length[node])]
+
+    def NumBytes(self) -> int:
+        """
+        Returns the memory used by the node arrays.
+        """
+        arrays = [self.first_child, self.next_sibling, self.edge_start, self.edge_length, self.suffix_link]
+        return sum(arr.nbytes for arr in arrays)
+
+    def ToDict(self) -> dict[int, list[list[int]]]:
+        """
+        Converts the tree into the adjacency dictionary returned by ConstructSuffixTree: the root is -1, the leaf of
+        the suffix starting at i is i, and internal nodes are numbered from n in the order they were created. Each
+        edge is [child node, start of label in word, label length].
+        """
+        n = self.n
+        tree = {-1: []}
+        for node in range(n):
+            tree[node] = []
+        for node in range(self.root + 1, self.num_nodes):
+            tree[node - 2] = []
+        for node in [self.root, *range(self.root + 1, self.num_nodes)]:
+            name = -1 if node == self.root else node - 2
+            for child in self.Children(node):
+                child_name = child if child < n else child - 2
+                tree[name].append([child_name, int(self.edge_start[child]), int(self.edge_length[child])])
+        return tree
@@ -0,0 +1,211 @@
+import os
+from array import array
+import numpy as np
+
+
+def main():
+    dirname = os.path.dirname(__file__)
+    filepath = os.path.join(dirname, "inputs", "TrieMatching", "input_0.txt")
+    with open(filepath) as f:
+        text = f.readline().strip()
+        patterns = f.readline().strip().split()
+    matches = TrieMatching(text, patterns)
+
+    answerpath = os.path.join(dirname, "answer.txt")
+    with open(answerpath, "w") as f:
+        for pattern in matches:
+            f.write(f"{pattern}:")
+            for val in matches[pattern]:
+                f.write(f" {val}")
+            f.write("\n")
+
+
+class CompactTrie:
+    """
+    A trie stored as flat arrays. The trie is built one depth at a time with numpy: the nodes at depth d + 1 are the
+    distinct (parent, letter) pairs of the patterns that are longer than d, so the nodes are numbered in breadth
+    first order and the children of every node are contiguous and sorted by letter. A node takes 13 bytes, and no
+    edge list is ever scanned.
+
+    Properties:
+        alphabet: The sorted letters of the patterns. Letters are stored as their index in the alphabet.
+
+        num_nodes: The number of nodes. The root is node 0.
+
+        parent: The parent of each node (-1 for the root).
+
+        letter: The letter on the edge into each node.
+
+        child_start: The children of node v are nodes child_start[v] to child_start[v + 1] - 1.
+
+        level_start: The nodes at depth d are nodes level_start[d] to level_start[d + 1] - 1.
+
+        pattern_id: The index of the (first) pattern that ends at each node, or -1.
+    """
+    def __init__(self, patterns: list[str]):
+        chars = np.frombuffer("".join(patterns).encode("utf-32-le"), dtype=np.uint32)
+        alphabet_codes, codes = np.unique(chars, return_inverse=True)
+        codes = codes.reshape(-1).astype(np.int64)
+        self.alphabet = [chr(c) for c in alphabet_codes]
+        sigma = max(len(self.alphabet), 1)
+        lengths = np.array([len(p) for p in patterns], dtype=np.int64)
+        offsets = np.cumsum(lengths) - lengths
+
+        node_of_pattern = np.zeros(len(patterns), dtype=np.int64)  # The node each pattern has reached so far.
+        parents, letters, level_start = [np.array([-1])], [np.array([0])], [0, 1]
+        next_node = 1
+        depth = 0
+        alive = np.flatnonzero(lengths > 0)
+        while len(alive) > 0:
+            keys = node_of_pattern[alive] * sigma + codes[offsets[alive] + depth]
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            parents.append(unique_keys // sigma)
+            letters.append(unique_keys % sigma)
+            node_of_pattern[alive] = next_node + inverse.reshape(-1)
+            next_node += len(unique_keys)
+            level_start.append(next_node)
+            depth += 1
+            alive = alive[lengths[alive] > depth]
+
+        index_dtype = np.int32 if next_node < 2**31 else np.int64
+        self.num_nodes = next_node
+        self.parent = np.concatenate(parents).astype(index_dtype)
+        self.letter = np.concatenate(letters).astype(np.uint8 if sigma <= 256 else np.int32)
+        self.child_start = np.searchsorted(self.parent, np.arange(next_node + 1)).astype(index_dtype)
+        self.level_start = np.array(level_start, dtype=index_dtype)
+        self.pattern_id = np.full(next_node, -1, dtype=index_dtype)
+        self.pattern_id[node_of_pattern[::-1]] = np.arange(len(patterns) - 1, -1, -1)
+
+    def Child(self, node: int, letter: str) -> int:
+        """
+        Returns the child of a node along an edge with a given letter, or -1 if there is none.
+        """
+        start, end = int(self.child_start[node]), int(self.child_start[node + 1])
+        if letter not in self.alphabet or start == end:
+            return -1
+        code = self.alphabet.index(letter)
+        i = start + int(np.searchsorted(self.letter[start:end], code))
+        return i if i < end and self.letter[i] == code else -1
+
+    def Contains(self, pattern: str) -> bool:
+        """
+        Checks if a pattern is one of the patterns the trie was built from.
+        """
+        node = 0
+        for letter in pattern:
+            node = self.Child(node, letter)
+            if node == -1:
+                return False
+        return bool(self.pattern_id[node] >= 0)
+
+    def NumBytes(self) -> int:
+        """
+        Returns the memory used by the node arrays.
+        """
+        return self.parent.nbytes + self.letter.nbytes + self.child_start.nbytes + self.pattern_id.nbytes
+
+    def ToDict(self) -> dict[int, list[list[int, str]]]:
+        """
+        Converts the trie into the adjacency dictionary returned by ConstructTrie.
+        """
+        trie = {node: [] for node in range(self.num_nodes)}
+        for node, (parent, letter) in enumerate(zip(self.parent.tolist(), self.letter.tolist())):
+            if parent >= 0:
+                trie[parent].append([node, self.alphabet[letter]])
+        return trie
+
+
+class AhoCorasick:
+    """
+    An Aho-Corasick automaton over a CompactTrie. The failure link of a node is the node of its longest proper suffix
+    that is in the trie, and the transitions of every node are resolved through the failure links ahead of time, so
+    scanning a text takes one table lookup per character. Both are computed one depth at a time with numpy, since a
+    failure link always points to a shallower node.
+
+    Properties:
+        trie: The CompactTrie of the patterns.
+
+        fail: The failure link of each node.
+
+        output_link: The nearest node on the failure chain where a pattern ends (-1 if there is none).
+
+        depth: The depth of each node.
+
+        delta: The transitions, delta[node, code]. Code len(alphabet) is every letter outside the alphabet.
+    """
+    def __init__(self, patterns: list[str]):
+        self.patterns = patterns
+        self.trie = trie = CompactTrie(patterns)
+        sigma = len(trie.alphabet)
+        n = trie.num_nodes
+        index_dtype = trie.parent.dtype
+        self.fail = np.zeros(n, dtype=index_dtype)
+        self.output_link = np.full(n, -1, dtype=index_dtype)
+        self.depth = np.zeros(n, dtype=index_dtype)
+        self.delta = np.zeros((n, sigma + 1), dtype=index_dtype)
+        ends_pattern = trie.pattern_id >= 0
+        ends_pattern[0] = False  # An empty pattern is not reported.
+
+        for d in range(len(trie.level_start) - 1):
+            nodes = np.arange(trie.level_start[d], trie.level_start[d + 1])
+            self.depth[nodes] = d
+            if d >= 2:
+                self.fail[nodes] = self.delta[self.fail[trie.parent[nodes]], trie.letter[nodes]]
+            if d >= 1:
+                fail = self.fail[nodes]
+                self.delta[nodes] = self.delta[fail]
+                self.output_link[nodes] = np.where(ends_pattern[fail], fail, self.output_link[fail])
+            if d + 1 < len(trie.level_start) - 1:
+                children = np.arange(trie.level_start[d + 1], trie.level_start[d + 2])
+                self.delta[trie.parent[children], trie.letter[children]] = children
+        self.ends_pattern = ends_pattern
+
+    def Scan(self, text: str) -> list[tuple[int, int]]:
+        """
+        Finds every occurrence of every pattern in a text in one pass.
+        Input:
+            text: The text being scanned.
+        Output:
+            A list of (starting position, pattern index) pairs, in order of where the occurrences end.
+        """
+        sigma = len(self.trie.alphabet)
+        lookup = {letter: i for i, letter in enumerate(self.trie.alphabet)}
+        text_codes = [lookup.get(letter, sigma) for letter in text]
+        width = sigma + 1
+        delta = array(self.delta.dtype.char, self.delta.tobytes())
+        reports = bytearray((self.ends_pattern | (self.output_link >= 0)).astype(np.uint8).tobytes())
+        output_link = self.output_link.tolist()
+        depth = self.depth.tolist()
+        pattern_id = self.trie.pattern_id.tolist()
+
+        matches = []
+        state = 0
+        for i, code in enumerate(text_codes):
+            state = delta[state * width + code]
+            if reports[state]:
+                node = state if pattern_id[state] >= 0 else output_link[state]
+                while node > 0:
+                    matches.append((i - depth[node] + 1, pattern_id[node]))
+                    node = output_link[node]
+        return matches
+
+
+def TrieMatching(text: str, patterns: list[str]) -> dict[str, list[int]]:
+    """
+    Finds where each pattern appears in a text, scanning the text once against all patterns with an Aho-Corasick
+    automaton.
+    Input:
+        text: The text being searched.
+        patterns: The patterns. Empty patterns are never reported.
+    Output:
+        A dictionary from each pattern to its sorted starting positions in text.
+    """
+    automaton = AhoCorasick(patterns)
+    match_locations = {pattern: [] for pattern in patterns}
+    for start, pattern_id in automaton.Scan(text):
+        match_locations[patterns[pattern_id]].append(start)
+    return match_locations
+
+
+if __name__ == "__main__":
+    main()
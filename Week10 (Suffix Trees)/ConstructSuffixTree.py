@@ -1,4 +1,5 @@
 from ConstructTrie import *
+from CompactSuffixTree import CompactSuffixTree
 
 
 def main():
@@ -24,7 +25,20 @@ def main():
 
 def ConstructSuffixTree(word: str) -> dict[int, list[list[int]]]:
     """
-    Constructs a suffix tree by first creating the suffix trie then compressing the edges down.
+    Constructs the suffix tree of a word in linear time with Ukkonen's algorithm (see UkkonenSuffixTree).
+    Input:
+        word: The word being used to construct a suffix tree.
+    Output:
+        The suffix tree as an adjacency dictionary. The root is -1, the leaf of the suffix starting at i is i, and
+        internal nodes are numbered from len(word). Each edge is [child node, start of label in word, label length].
+    """
+    return UkkonenSuffixTree(word)
+
+
+def ConstructSuffixTreeQuadratic(word: str) -> dict[int, list[list[int]]]:
+    """
+    Constructs a suffix tree by inserting every suffix from the root (O(n^2) time). Gives the same tree as
+    ConstructSuffixTree, but the nodes may be numbered and the edges listed in a different order.
     Input:
         word: The word being used to construct a suffix tree.
     """
@@ -36,6 +50,19 @@ def ConstructSuffixTree(word: str) -> dict[int, list[list[int]]]:
     return tree
 
 
+def UkkonenSuffixTree(word: str) -> dict[int, list[list[int]]]:
+    """
+    Builds a suffix tree in linear time with Ukkonen's algorithm (see CompactSuffixTree.BuildUkkonen).
+    Suffixes that end inside the tree (when word does not end with a unique character) end on a zero length edge,
+    like in GrowTree.
+    Input:
+        word: The word being used to construct a suffix tree.
+    Output:
+        The suffix tree in the same format as ConstructSuffixTree.
+    """
+    return CompactSuffixTree(word).ToDict()
+
+
 def GetAllEdgeLabels(t: dict[int, list[list[int]]], word: str) -> list[str]:
     """
     Converts all the start position, weight labels of a suffix tree into the actual string they represent.
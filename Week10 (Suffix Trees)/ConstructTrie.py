@@ -1,4 +1,5 @@
 import os
+from CompactTrie import CompactTrie
 
 def main():
     dirname = os.path.dirname(__file__)
@@ -21,7 +22,19 @@ def ReadFile_ConstructTrie(filepath) -> list[str]:
 
 def ConstructTrie(words) -> dict[int, list[list[int, str]]]:
     """
-    Constructs a trie from a list of words:
+    Constructs a trie from a list of words with the array backed CompactTrie. The nodes are numbered in breadth first
+    order.
+    Input:
+        words: the list of words
+    Output:
+        A trie represented as a adjacency dictionary.
+    """
+    return CompactTrie(words).ToDict()
+
+
+def ConstructTrieByInsertion(words) -> dict[int, list[list[int, str]]]:
+    """
+    Constructs a trie by inserting the words one at a time with GrowTrie. The nodes are numbered in insertion order.
     Input:
         words: the list of words
     Output:
@@ -40,6 +53,7 @@ def GrowTrie(new_word: str, t: dict[int, list[list[int, str]]]):
         t: the trie represented as an adjacency dictionary.
     """
     current_node = 0 
+    first_unmatched_idx = len(new_word)  # The whole word is already in the trie unless a letter is unmatched.
     for i, letter in enumerate(new_word):
         edge = LookForEdge(letter, t[current_node])
         if edge is not None:
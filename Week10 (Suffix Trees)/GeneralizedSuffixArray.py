@@ -0,0 +1,169 @@
+import os
+from bisect import bisect_right
+from collections import deque
+import numpy as np
+from SuffixArrayConstruction import BuildSuffixArray
+from LCPArray import LCPArray
+
+
+def main():
+    dirname = os.path.dirname(__file__)
+    filepath = os.path.join(dirname, "inputs", "LCS_TwoWords", "dataset_876287_6.txt")
+    with open(filepath) as f:
+        words = [line.strip() for line in f if line.strip()]
+    answer = KCommonSubstring(words, len(words))
+
+    answerpath = os.path.join(dirname, "answer.txt")
+    with open(answerpath, "w") as f:
+        f.write(answer)
+
+
+class GeneralizedSuffixArray:
+    """
+    The suffix array and LCP array of many words at once. The words are joined with a different separator after
+    each one. Separators are smaller than every letter and each appears once, so no common prefix runs across the
+    end of a word.
+
+    Properties:
+        words: The words.
+
+        word_starts: The position of each word in the joined text.
+
+        suffix_arr: The suffix array of the joined text.
+
+        lcp: The LCP array of the joined text (see LCPArray).
+
+        docs: docs[i] is the index of the word that suffix_arr[i] starts in.
+    """
+    def __init__(self, words: list[str]):
+        self.words = words
+        m = len(words)
+        lengths = np.array([len(word) + 1 for word in words], dtype=np.int64)
+        self.word_starts = np.cumsum(lengths) - lengths
+        codes = [m + np.frombuffer(word.encode("utf-32-le"), dtype=np.uint32).astype(np.int64) for word in words]
+        text = np.empty(int(lengths.sum()), dtype=np.int64)
+        for j, word_codes in enumerate(codes):
+            start = int(self.word_starts[j])
+            text[start : start + len(word_codes)] = word_codes
+            text[start + len(word_codes)] = j  # The separator of word j.
+        self.suffix_arr = BuildSuffixArray(text)
+        self.lcp = LCPArray(text.tolist(), self.suffix_arr)
+        self.docs = np.repeat(np.arange(m), lengths)[self.suffix_arr]
+
+    def Substring(self, row: int, length: int) -> str:
+        """
+        Returns the first length characters of the suffix in a row of the suffix array.
+        """
+        start = int(self.suffix_arr[row])
+        doc = int(self.docs[row])
+        offset = start - int(self.word_starts[doc])
+        return self.words[doc][offset : offset + length]
+
+
+def KCommonSubstring(words: list[str], k: int) -> str:
+    """
+    Finds the longest substring that appears in at least k of the words, by sliding a window over the generalized
+    suffix array. The window is the shortest run of rows that ends at each row and covers k different words, and
+    the substring it shares is the smallest LCP inside it (kept in a monotonic queue), so the whole scan is O(N) on
+    top of building the suffix array.
+    Input:
+        words: The words.
+        k: The number of words the substring has to appear in (1 <= k <= len(words)).
+    Output:
+        The longest such substring ("" if there is none).
+    """
+    m = len(words)
+    if not 1 <= k <= m:
+        raise ValueError(f"k must be between 1 and the number of words ({m}).")
+    if k == 1:
+        return max(words, key=len)
+    gsa = GeneralizedSuffixArray(words)
+    docs = gsa.docs.tolist()
+    lcp = gsa.lcp.tolist()
+
+    best_row, best_length = 0, 0
+    counts = [0] * m
+    num_docs = 0
+    window_min = deque()  # Rows j in the window (lcp[j] compares j - 1 and j) with increasing lcp values.
+    low = m  # The first m rows are the separators.
+    for high in range(m, len(docs)):
+        if counts[docs[high]] == 0:
+            num_docs += 1
+        counts[docs[high]] += 1
+        if high > low:
+            while window_min and lcp[window_min[-1]] >= lcp[high]:
+                window_min.pop()
+            window_min.append(high)
+        while num_docs >= k:
+            if lcp[window_min[0]] > best_length:
+                best_row, best_length = window_min[0], lcp[window_min[0]]
+            counts[docs[low]] -= 1
+            if counts[docs[low]] == 0:
+                num_docs -= 1
+            low += 1
+            while window_min and window_min[0] <= low:
+                window_min.popleft()
+    return gsa.Substring(best_row, best_length)
+
+
+def CommonSubstringProfile(words: list[str]) -> dict[int, str]:
+    """
+    Finds, for every k from 2 to len(words), the longest substring that appears in at least k of the words, in one
+    bottom-up pass over the LCP intervals of the generalized suffix array. The number of different words below an
+    interval is its number of suffixes minus the number of pairs of suffixes from the same word that are next to
+    each other (in suffix array order) inside it. Each such pair is charged to the smallest open interval that
+    holds both, which is found by binary search on the stack of open intervals. O(N log N) time.
+    Input:
+        words: The words.
+    Output:
+        A dictionary from k to the longest substring in at least k words ("" if there is none).
+    """
+    m = len(words)
+    if m < 2:
+        return {}
+    gsa = GeneralizedSuffixArray(words)
+    docs = gsa.docs.tolist()
+    lcp = gsa.lcp.tolist()
+    n = len(docs)
+
+    best = {}  # Number of different words -> (length, row) of the deepest interval with that many.
+    heights, left_bounds, num_suffixes, num_repeats = [0], [0], [0], [0]  # The stack of open intervals.
+    last_row = [-1] * m
+    last_row[docs[0]] = 0
+    for i in range(1, n + 1):
+        length = lcp[i] if i < n else 0
+        left_bound = i - 1
+        child_suffixes, child_repeats = 1, 0  # Suffix i - 1, or the interval that ends with it.
+        while length < heights[-1]:
+            height = heights.pop()
+            left_bound = left_bounds.pop()
+            child_suffixes += num_suffixes.pop()
+            child_repeats += num_repeats.pop()
+            count = child_suffixes - child_repeats
+            if height > best.get(count, (0, 0))[0]:
+                best[count] = (height, left_bound)
+        if length > heights[-1]:
+            heights.append(length)
+            left_bounds.append(left_bound)
+            num_suffixes.append(child_suffixes)
+            num_repeats.append(child_repeats)
+        else:
+            num_suffixes[-1] += child_suffixes
+            num_repeats[-1] += child_repeats
+
+        if i < n:
+            previous = last_row[docs[i]]
+            if previous >= 0:
+                num_repeats[bisect_right(left_bounds, previous) - 1] += 1
+            last_row[docs[i]] = i
+
+    profile = {}
+    longest = (0, 0)
+    for k in range(m, 1, -1):
+        longest = max(longest, best.get(k, (0, 0)))
+        profile[k] = gsa.Substring(longest[1], longest[0])
+    return dict(sorted(profile.items()))
+
+
+if __name__ == "__main__":
+    main()
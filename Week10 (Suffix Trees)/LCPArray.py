@@ -0,0 +1,121 @@
+import numpy as np
+from SuffixArrayConstruction import BuildSuffixArray
+
+NO_LETTER = -2  # Left letter of an interval that has no suffixes yet.
+LEFT_DIVERSE = -1  # Left letter of an interval whose suffixes are preceded by different letters (or by nothing).
+
+
+def LCPArray(word: str, suffix_arr: np.ndarray = None) -> np.ndarray:
+    """
+    Builds the longest common prefix array of a word with Kasai's algorithm in O(n) time. The suffixes are visited
+    in text order, and the common prefix of each suffix with the suffix before it in the suffix array is at most one
+    shorter than the previous suffix's, so the matched length only ever drops by one per step.
+    Input:
+        word: The word.
+        suffix_arr: (Optional) The suffix array of word, if it has already been built.
+    Output:
+        An array where element i is the length of the longest common prefix of suffix_arr[i - 1] and suffix_arr[i]
+        (element 0 is 0).
+    """
+    n = len(word)
+    if suffix_arr is None:
+        suffix_arr = BuildSuffixArray(word)
+    suffix_list = suffix_arr.tolist()
+    rank = [0] * n
+    for i, start in enumerate(suffix_list):
+        rank[start] = i
+    lcp = [0] * n
+    length = 0
+    for start in range(n):
+        if rank[start] == 0:
+            length = 0
+            continue
+        previous = suffix_list[rank[start] - 1]
+        while start + length < n and previous + length < n and word[start + length] == word[previous + length]:
+            length += 1
+        lcp[rank[start]] = length
+        if length > 0:
+            length -= 1
+    return np.array(lcp, dtype=suffix_arr.dtype if n > 0 else np.int32)
+
+
+def LongestRepeat(word: str, suffix_arr: np.ndarray = None, lcp: np.ndarray = None) -> str:
+    """
+    Finds the longest substring that appears at least twice in a word: the longest common prefix of two suffixes
+    that are next to each other in the suffix array.
+    Input:
+        word: The word.
+        suffix_arr: (Optional) The suffix array of word.
+        lcp: (Optional) The LCP array of word.
+    """
+    if len(word) < 2:
+        return ""
+    if suffix_arr is None:
+        suffix_arr = BuildSuffixArray(word)
+    if lcp is None:
+        lcp = LCPArray(word, suffix_arr)
+    i = int(np.argmax(lcp))
+    start = int(suffix_arr[i])
+    return word[start : start + int(lcp[i])]
+
+
+def MaximalRepeats(
+    word: str, min_length: int = 1, suffix_arr: np.ndarray = None, lcp: np.ndarray = None
+) -> list[tuple[str, list[int]]]:
+    """
+    Finds every maximal repeat of a word, in one bottom-up pass over the LCP intervals. A repeat is maximal if it
+    cannot be extended to the right (it is an LCP interval: the suffixes that start with it do not all continue with
+    the same letter) or to the left (they are not all preceded by the same letter).
+    Input:
+        word: The word.
+        min_length: The shortest repeat reported.
+        suffix_arr: (Optional) The suffix array of word.
+        lcp: (Optional) The LCP array of word.
+    Output:
+        A list of (repeat, sorted starting positions), longest repeats first.
+    """
+    n = len(word)
+    if n < 2:
+        return []
+    if suffix_arr is None:
+        suffix_arr = BuildSuffixArray(word)
+    if lcp is None:
+        lcp = LCPArray(word, suffix_arr)
+    suffix_list = suffix_arr.tolist()
+    lcp_list = lcp.tolist()
+    left_letters = [ord(word[start - 1]) if start > 0 else LEFT_DIVERSE for start in suffix_list]
+
+    repeats = []
+    stack = [[0, 0, NO_LETTER]]  # Open LCP intervals: [length, left bound, left letter].
+    for i in range(1, n + 1):
+        length = lcp_list[i] if i < n else 0
+        left_bound = i - 1
+        child_left = left_letters[i - 1]  # The left letter of suffix i - 1, or of the interval that ends with it.
+        while length < stack[-1][0]:
+            interval_length, left_bound, left = stack.pop()
+            left = MergeLeftLetters(left, child_left)
+            if interval_length >= min_length and left == LEFT_DIVERSE:
+                start = suffix_list[left_bound]
+                positions = sorted(suffix_list[left_bound:i])
+                repeats.append((word[start : start + interval_length], positions))
+            child_left = left
+        if length > stack[-1][0]:
+            stack.append([length, left_bound, child_left])
+        else:
+            stack[-1][2] = MergeLeftLetters(stack[-1][2], child_left)
+
+    repeats.sort(key=lambda repeat: (-len(repeat[0]), repeat[0]))
+    return repeats
+
+
+def MergeLeftLetters(a: int, b: int) -> int:
+    """
+    Combines the left letters of two groups of suffixes.
+    Input:
+        a, b: The left letter codes of the two groups (NO_LETTER for an empty group, LEFT_DIVERSE if mixed).
+    """
+    if a == NO_LETTER:
+        return b
+    if b == NO_LETTER or a == b:
+        return a
+    return LEFT_DIVERSE
@@ -1,5 +1,6 @@
 import os
 from ConstructSuffixTree import *
+from LCPArray import LongestRepeat
 
 def main():
     dirname = os.path.dirname(__name__)
@@ -13,12 +14,18 @@ def main():
         f.write(answer)
 
 
-def LongestCommonSubstring(word: str):
+def LongestCommonSubstring(word: str, method: str = "lcp"):
     """
     Finds the longest common substring in a word.
     Input:
         word: The word for which to find the longest common substring
+        method: "lcp" to read it off the suffix array and LCP array in O(n) (see LCPArray.LongestRepeat), or "tree"
+            to find the deepest internal node of the suffix tree.
     """
+    if method == "lcp":
+        return LongestRepeat(word)
+    if method != "tree":
+        raise ValueError(f"Unknown longest common substring method: {method}")
     word = word + "$"
     tree = ConstructSuffixTree(word)
     path, _ = FindDeepestInternalNode(tree, [-1], 0)
@@ -47,28 +54,35 @@ def FindDeepestInternalNode(
     tree: dict[int, list[int]], current_path: list[int], current_depth: int
 ) -> tuple[list[int], int]:
     """
-    Recursively finds the deepest internal node in a suffix tree.
+    Finds the deepest internal node in a suffix tree below the end of a path. The tree is walked depth first with an
+    explicit stack (so deep trees do not hit the recursion limit), and only the parent of each node is remembered.
+    The path is rebuilt for the deepest node alone.
     Input:
         tree: The suffix tree.
         current_path: the path to the current node.
-        best_depth: The depth of the deepest internal node found so far.
+        current_depth: The depth of the current node.
     Output:
-        The path taken to the deepest internal node.
+        The path taken to the deepest internal node, and its depth.
     """
-    current_node = current_path[-1]
-    best_path, best_depth = current_path, current_depth
+    parent = {current_path[-1]: None}
+    best_node, best_depth = current_path[-1], current_depth
+    stack = [(current_path[-1], current_depth)]
+    while stack:
+        node, depth = stack.pop()
+        if depth > best_depth:
+            best_node, best_depth = node, depth
+        for edge in reversed(tree[node]):  # Reversed so children are visited in order.
+            child_node = edge[0]
+            if len(tree[child_node]) > 0:  # If child node is not a leaf
+                parent[child_node] = node
+                stack.append((child_node, depth + edge[2]))
 
-    for edge in tree[current_node]:
-        child_node = edge[0]
-        if len(tree[child_node]) > 0: # If child node is not a leaf
-            new_path, new_depth = FindDeepestInternalNode(
-                tree, [*current_path, child_node], current_depth + edge[2]
-            )
-            if new_depth > best_depth:
-                best_depth = new_depth
-                best_path = new_path
-
-    return best_path, best_depth
+    path = []
+    node = best_node
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    return [*current_path[:-1], *reversed(path)], best_depth
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import os
 from ConstructSuffixTree import *
 from LCS import ConstructSubstring
+from GeneralizedSuffixArray import KCommonSubstring
 
 
 def main():
@@ -16,12 +17,19 @@ def main():
         f.write(answer)
 
 
-def LCS_TwoWords(w1: str, w2: str) -> str:
+def LCS_TwoWords(w1: str, w2: str, method: str = "lcp") -> str:
     """
-    Finds the longest common substring between two words using a suffix tree.
+    Finds the longest common substring between two words.
     w1: the first word.
     w2: the second word.
+    method: "lcp" to use the generalized suffix array (see GeneralizedSuffixArray.KCommonSubstring, which also
+        handles many words), or "tree" to use a suffix tree of both words.
     """
+    if method == "lcp":
+        substring = KCommonSubstring([w1, w2], 2)
+        return substring if substring != "" else "nan"
+    if method != "tree":
+        raise ValueError(f"Unknown longest common substring method: {method}")
     w1 = w1 + "$"
     w2 = w2 + "#"
     word = "".join([w1, w2])
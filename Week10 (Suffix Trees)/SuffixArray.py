@@ -1,4 +1,5 @@
 import os
+from SuffixArrayConstruction import BuildSuffixArray
 
 def main():
     dirname = os.path.dirname(__file__)
@@ -21,10 +22,7 @@ def SuffixArray(s: str):
     """
     Gets the index order of the suffix array:
     """
-    suffixes = [(i,s[i:]) for i in range(len(s))]
-    suffixes = sorted(suffixes, key=lambda x: x[1])
-    indexes = [x[0] for x in suffixes]
-    return indexes
+    return BuildSuffixArray(s)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
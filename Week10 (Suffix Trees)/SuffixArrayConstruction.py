@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def BuildSuffixArray(word: "str | np.ndarray") -> np.ndarray:
+    """
+    Builds the suffix array of a word using prefix doubling over integer rank arrays. Each round sorts the suffixes
+    by the ranks of their first 2^k characters, so the whole build takes O(n log^2 n) time and O(n) memory. No suffix
+    is ever materialised as a string.
+    Input:
+        word: The word to build the suffix array of. A suffix that is a prefix of another suffix is ordered first,
+            so words ending in a unique smallest character (e.g. "$") give the same order as sorting rotations.
+            May also be given as an array of integer character codes (e.g. the ascii codes of a packed sequence).
+    Output:
+        The suffix array as a numpy integer array. Element i is the starting position of the i'th smallest suffix.
+    """
+    n = len(word)
+    index_dtype = np.int32 if n < 2**31 else np.int64
+    if n == 0:
+        return np.zeros(0, dtype=index_dtype)
+
+    if isinstance(word, np.ndarray):
+        codes = word
+    else:
+        codes = np.frombuffer(word.encode("utf-32-le"), dtype=np.uint32)
+    _, rank = np.unique(codes, return_inverse=True)
+    rank = rank.astype(np.int64)
+    suffix_arr = np.argsort(rank, kind="stable")
+    step = 1
+    while rank.max() < n - 1:
+        # Rank of the suffix starting step characters later. -1 marks a suffix that runs off the end of the word.
+        next_rank = np.full(n, -1, dtype=np.int64)
+        next_rank[: n - step] = rank[step:]
+        # Sort on the pair (rank, next_rank) itself: packing it into one integer key overflows int64 for large n.
+        suffix_arr = np.lexsort((next_rank, rank))
+
+        sorted_rank = rank[suffix_arr]
+        sorted_next_rank = next_rank[suffix_arr]
+        is_new_group = np.empty(n, dtype=np.int64)
+        is_new_group[0] = 0
+        is_new_group[1:] = (sorted_rank[1:] != sorted_rank[:-1]) | (sorted_next_rank[1:] != sorted_next_rank[:-1])
+        rank = np.empty(n, dtype=np.int64)
+        rank[suffix_arr] = np.cumsum(is_new_group)
+        step *= 2
+
+    return suffix_arr.astype(index_dtype)
+
@@ -1,7 +1,13 @@
-import os
+import os, sys
+import numpy as np
 from PartialSuffixArray import *
 from BurrowsWheeler import *
 from BWTDecode import *
+# SuffixArrayConstruction is shared with Week10 rather than copied.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Week10 (Suffix Trees)"))
+from SuffixArrayConstruction import BuildSuffixArray
+from OccTable import OccTable
+from BidirectionalIndex import BidirectionalIndex
 
 def main():
     dirname = os.path.dirname(__file__)
@@ -25,37 +31,206 @@ def ReadData_ApproximateMatching(filepath: str) -> tuple[str, list[str], int]:
     return word, patterns, num_mismatches
 
 
-def MultiApproximateMatching(word: str, patterns: list[str], num_mismatches: int):
+def MultiApproximateMatching(word: "str | PackedSequence", patterns: list[str], num_mismatches: int, mode: str = "seed"):
     """
     Finds approximate pattern matches in a word for each pattern in a list of patterns. An approximate match is a match
     that has a limit on the number of mismatched characters.
     Input:
-        word: The word being searched for patterns.
+        word: The word being searched for patterns (a string or a PackedSequence).
         patterns: A list of patterns.
         num_mismatches: The number of allowed mismatches.
+        mode: How each pattern is searched.
+            "seed": split the pattern into num_mismatches + 1 exact seeds and verify the candidates they hit.
+            "backtrack": branch on every letter, pruned by a lower bound on the mismatches still needed.
+            "scheme": search schemes over a bidirectional index (see BidirectionalIndex.SearchSchemeMatch).
+            "exhaustive": branch on every letter at every position.
     Output:
         A list of starting indexes for each pattern. The starting index indicates the position in the word that the
         pattern starts at.
     """
+    if mode not in ("seed", "backtrack", "scheme", "exhaustive"):
+        raise ValueError(f"Unknown approximate matching mode: {mode}")
+    if mode == "scheme":
+        index = BidirectionalIndex(word)
+        return {pattern: index.SearchSchemeMatch(pattern, num_mismatches) for pattern in patterns}
+    text = AsciiCodes(word)
     word = word + "$"
     suffix_arr = CreateSuffixArray(word)
-    bw_word = bwt(word)
+    bw_word = bwt(word, suffix_arr)
     ranks = GetRanks(bw_word)
-    count_matrix = GetCharPositions(bw_word)
+    occ = OccTable(bw_word)
+    if mode == "backtrack":
+        rev_bw_word = bwt(word[-2::-1] + "$")
+        rev_ranks = GetRanks(rev_bw_word)
+        rev_occ = OccTable(rev_bw_word)
+
     match_dict = {}
     for pattern in patterns:
-        match_dict[pattern] = ApproximateMatching(pattern, bw_word, num_mismatches, suffix_arr, ranks, count_matrix)
+        if mode == "seed" and len(pattern) > num_mismatches:
+            match_dict[pattern] = SeedAndVerifyMatching(pattern, text, num_mismatches, suffix_arr, ranks, occ)
+        elif mode == "backtrack":
+            match_dict[pattern] = BacktrackMatching(
+                pattern, num_mismatches, suffix_arr, ranks, occ, rev_ranks, rev_occ
+            )
+        else:
+            match_dict[pattern] = ApproximateMatching(pattern, bw_word, num_mismatches, suffix_arr, ranks, occ)
 
     return match_dict
 
 
+def SeedAndVerifyMatching(
+    pattern: str,
+    text: np.ndarray,
+    num_mismatches: int,
+    suffix_arr: np.ndarray,
+    ranks: dict[str, int],
+    occ: OccTable,
+) -> list[int]:
+    """
+    Performs approximate pattern matching by the pigeonhole principle. If the pattern is split into num_mismatches + 1
+    pieces, any match with at most num_mismatches mismatches contains at least one piece exactly. Each piece is found
+    with backward search, and every match it implies is checked by Hamming distance.
+    Input:
+        pattern: The pattern being searched for. Must be longer than num_mismatches.
+        text: The ascii codes of the word being searched (without "$").
+        num_mismatches: The number of mismatches allowed.
+        suffix_arr: The suffix array of the word (with "$").
+        ranks: the number of characters that are smaller in the bw transformed word.
+        occ: The rank (Occ) table of the bw transformed word.
+    Output:
+        The sorted locations of the approximate matches in word.
+    """
+    m = len(pattern)
+    if m > len(text):
+        return []
+    num_seeds = num_mismatches + 1
+    candidates = []
+    for j in range(num_seeds):
+        seed_start, seed_end = j * m // num_seeds, (j + 1) * m // num_seeds
+        top, bot = 0, len(suffix_arr)
+        for letter in reversed(pattern[seed_start:seed_end]):
+            top, bot = occ.TopBot(letter, top, bot, ranks)
+            if top >= bot:
+                break
+        if top < bot:
+            candidates.append(suffix_arr[top:bot].astype(np.int64) - seed_start)
+    if len(candidates) == 0:
+        return []
+
+    starts = np.unique(np.concatenate(candidates))
+    starts = starts[(starts >= 0) & (starts <= len(text) - m)]
+    pattern_codes = np.frombuffer(pattern.encode("ascii"), dtype=np.uint8)
+    windows = text[starts[:, None] + np.arange(m)]
+    mismatches = np.count_nonzero(windows != pattern_codes, axis=1)
+    return starts[mismatches <= num_mismatches].tolist()
+
+
+def BacktrackMatching(
+    pattern: str,
+    num_mismatches: int,
+    suffix_arr: np.ndarray,
+    ranks: dict[str, int],
+    occ: OccTable,
+    rev_ranks: dict[str, int],
+    rev_occ: OccTable,
+) -> list[int]:
+    """
+    Performs approximate pattern matching by backtracking backward search (see BacktrackRows).
+    Input:
+        pattern: The pattern being searched for.
+        num_mismatches: The number of mismatches allowed.
+        suffix_arr: The suffix array of the word (with "$").
+        ranks: the number of characters that are smaller in the bw transformed word.
+        occ: The rank (Occ) table of the bw transformed word.
+        rev_ranks: The ranks of the bw transformed reversed word.
+        rev_occ: The rank (Occ) table of the bw transformed reversed word.
+    Output:
+        The sorted locations of the approximate matches in word.
+    """
+    rows = BacktrackRows(pattern, num_mismatches, ranks, occ, rev_ranks, rev_occ)
+    return sorted(suffix_arr[rows].tolist())
+
+
+def BacktrackRows(
+    pattern: str,
+    num_mismatches: int,
+    ranks: dict[str, int],
+    occ: OccTable,
+    rev_ranks: dict[str, int],
+    rev_occ: OccTable,
+) -> np.ndarray:
+    """
+    Finds the Burrows-Wheeler matrix rows of every match of a pattern with at most num_mismatches mismatches, by
+    backtracking backward search. A branch is dropped as soon as the mismatches it has left are fewer than the lower
+    bound (from LowerBoundArray) on the mismatches the rest of the pattern needs. The rows are returned rather than
+    located, so the caller can locate them with whatever suffix array (full or sampled) it has.
+    Input:
+        pattern: The pattern being searched for.
+        num_mismatches: The number of mismatches allowed.
+        ranks: the number of characters that are smaller in the bw transformed word.
+        occ: The rank (Occ) table of the bw transformed word.
+        rev_ranks: The ranks of the bw transformed reversed word.
+        rev_occ: The rank (Occ) table of the bw transformed reversed word.
+    Output:
+        The rows of the matches as an int64 array.
+    """
+    alphabet = [letter for letter in sorted(ranks.keys()) if letter != "$"]
+    lower_bound = LowerBoundArray(pattern, rev_ranks, rev_occ)
+    ranges = []
+    # Each entry: (index of the next pattern letter to match, mismatches left, top, bot).
+    stack = [(len(pattern) - 1, num_mismatches, 0, occ.n)]
+    while stack:
+        i, mismatches_left, top, bot = stack.pop()
+        if i < 0:
+            ranges.append(np.arange(top, bot, dtype=np.int64))
+            continue
+        if mismatches_left < lower_bound[i]:
+            continue
+        for letter in alphabet:
+            new_top, new_bot = occ.TopBot(letter, top, bot, ranks)
+            if new_top >= new_bot:
+                continue
+            if letter == pattern[i]:
+                stack.append((i - 1, mismatches_left, new_top, new_bot))
+            elif mismatches_left > 0:
+                stack.append((i - 1, mismatches_left - 1, new_top, new_bot))
+    if not ranges:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(ranges)
+
+
+def LowerBoundArray(pattern: str, rev_ranks: dict[str, int], rev_occ: OccTable) -> list[int]:
+    """
+    Computes a lower bound on the number of mismatches needed to match each prefix of a pattern. The prefix is cut
+    greedily into pieces that do not occur in the word. Every piece needs at least one mismatch. Substrings are
+    checked with backward search over the reversed word, so the pieces can be extended to the right.
+    Input:
+        pattern: The pattern being searched for.
+        rev_ranks: The ranks of the bw transformed reversed word.
+        rev_occ: The rank (Occ) table of the bw transformed reversed word.
+    Output:
+        A list where element i is the lower bound for pattern[: i + 1].
+    """
+    n = rev_occ.n
+    lower_bound = []
+    num_pieces = 0
+    top, bot = 0, n
+    for letter in pattern:
+        top, bot = rev_occ.TopBot(letter, top, bot, rev_ranks)
+        if top >= bot:
+            num_pieces += 1
+            top, bot = 0, n
+        lower_bound.append(num_pieces)
+    return lower_bound
+
+
 def ApproximateMatching(
     pattern: str,
     bw_word: str,
     num_mismatches: int,
     suffix_arr: list[int],
     ranks: dict[str, int],
-    count_matrix: dict[str, list[int]],
+    occ: OccTable,
 ):
     """
     Performs approximate pattern matching for one pattern against a given word.
@@ -65,8 +240,7 @@ def ApproximateMatching(
         num_mismatches: The number of mismatches allowed.
         suffix_arr: The suffix array corresponding to the bw transformed word
         ranks: the number of characters that are smaller in bw_word.
-        count_matrix: The position for each character in bw_word as well as the number of times that character has 
-        appeared. 
+        occ: The rank (Occ) table of bw_word.
     Output:
         The locations of the approximate matches in word.
     """
@@ -86,7 +260,7 @@ def ApproximateMatching(
                     continue
     
                 if i != len(pattern) - 1:
-                    new_top, new_bot = FindNewTopBot(bw_word, a, top, bot, ranks, count_matrix)
+                    new_top, new_bot = FindNewTopBot(bw_word, a, top, bot, ranks, occ)
                     if new_top == None:
                         continue
                     elif a != letter:
@@ -94,15 +268,13 @@ def ApproximateMatching(
                     else:
                         top_bot_dict[key+a] = [new_top, new_bot, mm_count]
                 else:
-                    locations.extend(FindNewTopBotFinalLetter(bw_word, a, top, bot, ranks, count_matrix))
+                    locations.extend(FindNewTopBotFinalLetter(bw_word, a, top, bot, ranks, occ))
 
     for idx, val in enumerate(locations):
-        locations[idx] = suffix_arr[val]
+        locations[idx] = int(suffix_arr[val])
     return locations
 
-def FindNewTopBot(
-    bw_word: str, letter: str, top_idx: int, bot_idx: int, ranks: dict[str, int], count_matrix: dict[str, list[int]]
-):
+def FindNewTopBot(bw_word: str, letter: str, top_idx: int, bot_idx: int, ranks: dict[str, int], occ: OccTable):
     """
     Finds the top and bottom index for the next iteration of BW suffix pattern matching.
     Input:
@@ -111,24 +283,18 @@ def FindNewTopBot(
         top_idx: The current top_idx
         bot_idx: the current bot_idx
         ranks: the number of characters that are smaller in bw_word.
-        count_matrix: The position for each character in bw_word as well as the number of times that character has 
-        appeared. 
+        occ: The rank (Occ) table of bw_word.
     Return:
-        A tuple of two integers. (new top idx, new bot idx)
-    """
-    new_top = None
-    new_bot = None
-    for i in range(top_idx, bot_idx):
-        if bw_word[i] == letter:
-            if new_top == None:
-                new_top = ranks[letter] + count_matrix[letter][i]
-                new_bot = new_top + 1
-            else:
-                new_bot += 1
+        A tuple of two integers. (new top idx, new bot idx). Both are None if letter does not appear between
+        top_idx and bot_idx.
+    """
+    new_top, new_bot = occ.TopBot(letter, top_idx, bot_idx, ranks)
+    if new_top >= new_bot:
+        return None, None
     return new_top, new_bot
 
 def FindNewTopBotFinalLetter(
-    bw_word: str, letter: str, top_idx: int, bot_idx: int, ranks: dict[str, int], count_matrix: dict[str, list[int]]
+    bw_word: str, letter: str, top_idx: int, bot_idx: int, ranks: dict[str, int], occ: OccTable
 ):
     """
     Finds the top and bottom index for the next iteration of BW suffix pattern matching.
@@ -138,30 +304,22 @@ def FindNewTopBotFinalLetter(
         top_idx: The current top_idx
         bot_idx: the current bot_idx
         ranks: the number of characters that are smaller in bw_word.
-        count_matrix: The position for each character in bw_word as well as the number of times that character has 
-        appeared. 
+        occ: The rank (Occ) table of bw_word.
     Return:
-        A tuple of two integers. (new top idx, new bot idx)
+        The rows of the final matches.
     """
-    final_rows = []
-    for i in range(top_idx, bot_idx):
-        if bw_word[i] == letter:
-            final_rows.append(ranks[letter]+count_matrix[letter][i])
-    return final_rows
+    new_top, new_bot = occ.TopBot(letter, top_idx, bot_idx, ranks)
+    return list(range(new_top, new_bot))
 
 
-def CreateSuffixArray(word: str) -> int:
+def CreateSuffixArray(word: "str | PackedSequence") -> np.ndarray:
     """
     Creates the suffix array of a word.
     Input:
-        word: The word of a suffix array.
-    """
-    suffixes = [[] for _ in range(len(word))]
-    for i in range(len(word)):
-        suffixes[i] = [i, word[i:] + word[:i]]
-    suffixes = sorted(suffixes, key=lambda x: x[1])
-    suffixes = [val[0] for val in suffixes]
-    return suffixes
+        word: The word of a suffix array. Should end with a unique smallest character (e.g. "$") so that sorting the
+            suffixes gives the same order as sorting the rotations.
+    """
+    return BuildSuffixArray(AsciiCodes(word))
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 import os
+import numpy as np
 from BWTDecode import *
+from OccTable import OccTable
 
 def main():
     dirpath = os.path.dirname(__file__)
@@ -7,14 +9,14 @@ def main():
     with open(filepath) as f:
         word = f.readline().strip()
         patterns = f.readline().strip().split()
-    answer = bwt_multi_matching(word, patterns)
+    tops, bots = BatchBWMatching(word, patterns)
 
     answerpath = os.path.join(dirpath, "answer.txt")
     with open(answerpath, "w") as f:
-        for i, match_indexes in enumerate(answer):
+        for i, num_matches in enumerate(bots - tops):
             if i != 0:
                 f.write(" ")
-            f.write(str(len(match_indexes)))
+            f.write(str(num_matches))
 
 def bwt_multi_matching(word: str, patterns: list[str]) -> list[list[int]]:
     """
@@ -33,7 +35,80 @@ def bwt_multi_matching(word: str, patterns: list[str]) -> list[list[int]]:
     
     return matches
 
-def bwt_matching(word: str, pattern: str, ranks: list[int] = None, idx_dict: dict[str, dict[int, int]] = None) -> list[int]:
+def BatchBWMatching(
+    word: str, patterns: list[str], ranks: dict[str, int] = None, occ: OccTable = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Backward searches many patterns at once. The patterns are sorted by their reversed sequence, which lays them out
+    as a trie read from the last character. Each step of backward search then only needs to be computed once for
+    every distinct suffix, and all of those steps at the same depth are done together with numpy.
+    Input:
+        word: the bwt encoded string being matched against.
+        patterns: the patterns we are looking for in word.
+        ranks: (Optional) The rank of each character in word, as returned by GetRanks.
+        occ: (Optional) The rank (Occ) table of word.
+    Output:
+        Two arrays, the top (inclusive) and bot (exclusive) row of the matches of each pattern. bot - top is the
+        number of times a pattern appears.
+    """
+    if ranks is None:
+        ranks = GetRanks(word)
+    if occ is None:
+        occ = OccTable(word)
+    num_patterns = len(patterns)
+    if num_patterns == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    order = sorted(range(num_patterns), key=lambda i: patterns[i][::-1])
+    lengths = np.array([len(patterns[i]) for i in order], dtype=np.int64)
+    max_length = int(lengths.max())
+    # Row j holds the j'th sorted pattern reversed, padded with zeros.
+    joined = np.frombuffer("".join(patterns[i][::-1] for i in order).encode("ascii"), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    columns = np.arange(len(joined)) - np.repeat(starts, lengths)
+    reversed_patterns = np.zeros((num_patterns, max_length), dtype=np.uint8)
+    reversed_patterns[np.repeat(np.arange(num_patterns), lengths), columns] = joined
+
+    # Length of the shared suffix between each pattern and the one sorted before it.
+    shared = np.zeros(num_patterns, dtype=np.int64)
+    if num_patterns > 1 and max_length > 0:
+        differs = reversed_patterns[1:] != reversed_patterns[:-1]
+        first_diff = np.where(differs.any(axis=1), differs.argmax(axis=1), max_length)
+        shared[1:] = np.minimum(first_diff, np.minimum(lengths[1:], lengths[:-1]))
+
+    rank_lookup = RankLookup(ranks)
+    in_alphabet = rank_lookup >= 0
+
+    tops = np.zeros(num_patterns, dtype=np.int64)
+    bots = np.full(num_patterns, len(word), dtype=np.int64)
+    rows = np.arange(num_patterns)
+    for depth in range(1, max_length + 1):
+        active = lengths >= depth
+        # The first pattern of every distinct suffix of this length does the search step for its whole group.
+        heads = np.flatnonzero(active & (shared < depth))
+        letters = reversed_patterns[heads, depth - 1]
+        new_tops = rank_lookup[letters] + occ.CountMany(letters, tops[heads])
+        new_bots = rank_lookup[letters] + occ.CountMany(letters, bots[heads])
+        missing = ~in_alphabet[letters] | (new_tops >= new_bots)
+        new_tops[missing] = 0
+        new_bots[missing] = 0
+
+        head_of = np.maximum.accumulate(np.where(active & (shared < depth), rows, 0))
+        step_tops = np.zeros(num_patterns, dtype=np.int64)
+        step_bots = np.zeros(num_patterns, dtype=np.int64)
+        step_tops[heads] = new_tops
+        step_bots[heads] = new_bots
+        tops[active] = step_tops[head_of[active]]
+        bots[active] = step_bots[head_of[active]]
+
+    result_tops = np.empty(num_patterns, dtype=np.int64)
+    result_bots = np.empty(num_patterns, dtype=np.int64)
+    result_tops[order] = tops
+    result_bots[order] = bots
+    return result_tops, result_bots
+
+
+def bwt_matching(word: str, pattern: str, ranks: list[int] = None, idx_dict: CharPositions = None) -> list[int]:
     """
     Finds all the locations of a pattern in a bwt encoded string.
     Input:
@@ -1,4 +1,7 @@
 import os
+import numpy as np
+from PackedDNA import PackedSequence, AsciiCodes
+from OccTable import *
 
 def main():
     dirpath = os.path.dirname(__file__)
@@ -14,40 +17,163 @@ def main():
 
 def BWTDecode(word: str) -> str:
     """
-    Decodes a Burrows-Wheeler encoded word.
+    Decodes a Burrows-Wheeler encoded word by walking the last-to-first mapping, built for every row at once.
     Input:
         word: The Burrows-Wheeler encoded word.
     """
-    ranks = GetRanks(word)
-    idx_dict = GetCharPositions(word)
-    decoded = "$"
-    next_idx = 0
-    for _ in range(len(word)-1):
-        next_char = word[next_idx]
-        decoded = "".join([next_char, decoded])
-        next_idx = ranks[next_char] + idx_dict[next_char][next_idx]
-   
-    return decoded
-    
+    chars = AsciiCodes(word)
+    last_to_first = GetCharPositions(chars).LastToFirst(chars, GetRanks(word))
+    idx = int(np.flatnonzero(chars == ord("$"))[0])  # The row ending in "$" holds the whole decoded word.
+    decoded = bytearray(len(word))
+    for pos in range(len(word) - 1, -1, -1):
+        decoded[pos] = chars[idx]
+        idx = last_to_first[idx]
+    return decoded.decode("ascii")
+
+
+def BWTDecodeToFile(word: str, filepath: str, chunk_size: int = 1 << 20, checkpoint_step: int = 128):
+    """
+    Decodes a Burrows-Wheeler encoded word straight into a file, holding at most chunk_size decoded characters in
+    memory at a time. Unlike BWTDecode, no last-to-first array is built (see DecodeChunks).
+    Input:
+        word: The Burrows-Wheeler encoded word.
+        filepath: The file the decoded word is written to.
+        chunk_size: The number of characters decoded before each write.
+        checkpoint_step: The distance between checkpoints of the Occ table used for the last-to-first steps.
+    """
+    with open(filepath, "wb") as f:
+        f.truncate(len(word))
+        for start, chunk in DecodeChunks(word, chunk_size, checkpoint_step):
+            f.seek(start)
+            f.write(chunk)
+
 
-def GetCharPositions(word: str) -> dict[str, dict[int, int]]:
+def DecodeChunks(word: "str | PackedSequence", chunk_size: int, checkpoint_step: int = 128):
+    """
+    Inverts a Burrows-Wheeler encoded word by walking the last-to-first mapping one row at a time. Every step is
+    counted with an OccTable (checkpoints plus popcounts over the word packed at 2 bits per base), so while decoding
+    only about n / 4 + 8 * sigma * n / checkpoint_step bytes are kept besides the word, instead of a machine word per
+    row. Building the table takes a few temporary bytes per base. Each step costs a count instead of an array lookup,
+    so this is about ten times slower than BWTDecode.
+    The decoded word comes out back to front, so it is produced as consecutive chunks starting from its end.
+    Input:
+        word: The Burrows-Wheeler encoded word. Must contain the "$" sentinel.
+        chunk_size: The number of characters in each chunk.
+        checkpoint_step: The distance between checkpoints of the Occ table (a multiple of 32).
+    Output:
+        Yields (start position, bytearray of decoded characters) pairs, last chunk first.
+    """
+    occ = OccTable(word, checkpoint_step)
+    ranks = {}
+    total = 0
+    for letter in occ.alphabet:
+        ranks[letter] = total
+        total += occ.Count(letter, occ.n)
+
+    if occ.sequence is not None:
+        packed = occ.sequence.packed
+        escapes = dict(zip(occ.sequence.escape_positions.tolist(), occ.sequence.escape_chars.tolist()))
+
+        def CharAt(i: int) -> int:
+            if i in escapes:
+                return escapes[i]
+            w, j = divmod(i, BASES_PER_WORD)
+            return int(DNA_LETTERS[(int(packed[w]) >> (2 * j)) & 3])
+
+        idx = int(occ.escapes["$"][0])  # The row ending in "$" holds the whole decoded word.
+    else:
+        chars = occ.chars
+
+        def CharAt(i: int) -> int:
+            return int(chars[i])
+
+        idx = int(np.flatnonzero(chars == ord("$"))[0])
+
+    end = occ.n
+    while end > 0:
+        start = max(0, end - chunk_size)
+        chunk = bytearray(end - start)
+        for pos in range(end - start - 1, -1, -1):
+            code = CharAt(idx)
+            chunk[pos] = code
+            letter = chr(code)
+            idx = ranks[letter] + occ.Count(letter, idx)
+        yield start, chunk
+        end = start
+
+
+def GetCharPositions(word: str) -> "CharPositions":
     """
     gets the indicies that each unique character in a word appears at.
     Input:
         word: The word being analyzed. (BW-transformed word)
     Output:
-        A dictionary where the key is a character of the alphabet. The values are dictionaries of integers to
-        integers. The inner dictionary key is the position of the alphabet letter, the inner dictionary value
-        is the number of times that character has appeared until that position.
-    """
-    char_idx_dict = {}
-    for i, letter in enumerate(word):
-        if letter in char_idx_dict:
-            order = len(char_idx_dict[letter])
-            char_idx_dict[letter][i] = order
-        else:
-            char_idx_dict[letter] = {i: 0}
-    return char_idx_dict
+        A CharPositions table. Indexing it with a character of the alphabet gives the positions of that character:
+        table[letter][i] is the number of times letter has appeared before position i (for a position i that holds
+        letter), and len(table[letter]) is the number of times letter appears in the word.
+    """
+    return CharPositions(word)
+
+
+class CharPositions:
+    """
+    Array-backed replacement for a dictionary of {character: {position: times seen before}}. One integer is stored
+    per position of the word instead of one dictionary entry per position.
+
+    Properties:
+        order: order[i] is the number of times word[i] appears in word before position i.
+
+        counts: The number of times each character appears in the word.
+    """
+    def __init__(self, word: "str | PackedSequence | np.ndarray"):
+        chars = AsciiCodes(word)
+        index_dtype = np.uint32 if len(chars) < 2**32 else np.uint64
+        # Sorting the positions by character (stably) lists the positions of each character in order, so the
+        # number of earlier occurrences is the distance from the start of that character's run.
+        by_char = np.argsort(chars, kind="stable")
+        letter_counts = np.bincount(chars, minlength=256)
+        run_starts = np.cumsum(letter_counts) - letter_counts
+        self.order = np.empty(len(chars), dtype=index_dtype)
+        self.order[by_char] = np.arange(len(chars)) - run_starts[chars[by_char]]
+        self.counts = {chr(c): int(letter_counts[c]) for c in np.flatnonzero(letter_counts)}
+
+    def __contains__(self, letter: str) -> bool:
+        return letter in self.counts
+
+    def __getitem__(self, letter: str) -> "LetterPositions":
+        if letter not in self.counts:
+            raise KeyError(letter)
+        return LetterPositions(self.order, self.counts[letter])
+
+    def keys(self):
+        return self.counts.keys()
+
+    def LastToFirst(self, word: str, ranks: dict[str, int]) -> np.ndarray:
+        """
+        Builds the whole last-to-first mapping in one vectorised pass. Element i is the row of the first column that
+        holds the same character as row i of the last column.
+        Input:
+            word: The word the table was built from.
+            ranks: The rank of each character, as returned by GetRanks.
+        """
+        chars = AsciiCodes(word)
+        return (RankLookup(ranks)[chars] + self.order).astype(self.order.dtype)
+
+
+class LetterPositions:
+    """
+    The positions of one character in a CharPositions table.
+    """
+    def __init__(self, order: np.ndarray, count: int):
+        self.order = order
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> int:
+        return int(self.order[i])
+
 
 def GetRanks(word: str) -> dict[str, int]:
     """
@@ -68,6 +194,20 @@ def GetRanks(word: str) -> dict[str, int]:
         total += letter_counts[char]
     return rank
 
+def RankLookup(ranks: dict[str, int]) -> np.ndarray:
+    """
+    Turns the ranks returned by GetRanks into a lookup table indexed by ascii code, so the ranks of many letters can be
+    looked up at once with numpy.
+    Input:
+        ranks: The rank of each character, as returned by GetRanks.
+    Output:
+        An int64 array of 256 ranks. Characters that do not appear in the word have rank -1.
+    """
+    rank_lookup = np.full(256, -1, dtype=np.int64)
+    for letter, rank in ranks.items():
+        rank_lookup[ord(letter)] = rank
+    return rank_lookup
+
 def CountLetters(word: str) -> dict[str, int]:
     """
     Counts the number of times a character occurs in word.
@@ -77,6 +217,8 @@ def CountLetters(word: str) -> dict[str, int]:
         A dictionary were the key is the character being analyzed, and the value is the number of times that letter
         occurs in word.
     """
+    if isinstance(word, PackedSequence):
+        return word.LetterCounts()
     count_dict = {}
     for character in word:
         if character in count_dict:
@@ -0,0 +1,224 @@
+import sys, json, time, platform, resource, subprocess, tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ApproximateMatching import CreateSuffixArray
+from SuffixArrayMatch import *
+
+STAGES = ["suffix_array", "bwt", "partial_count", "char_positions", "occ_table", "match"]
+REGRESSION_RATIO = 1.2  # A stage that gets this much slower or bigger between two runs is reported.
+MIN_COMPARED_SECONDS = 1e-3  # Timings shorter than this are too noisy to compare.
+
+
+def main():
+    """
+    Benchmark commands:
+        python Benchmark.py run <output json> [max size] [stage,stage,...]
+        python Benchmark.py compare <old json> <new json>
+    run times every stage on synthetic genomes of 10^3 bases up to max size (default 10^6, at most 10^8) and writes
+    the results as JSON. compare prints a table of two runs (e.g. from two commits) and exits with status 1 if any
+    stage regressed.
+    """
+    if len(sys.argv) >= 3 and sys.argv[1] == "run":
+        max_size = int(float(sys.argv[3])) if len(sys.argv) > 3 else 10**6
+        stages = sys.argv[4].split(",") if len(sys.argv) > 4 else STAGES
+        sizes = [10**e for e in range(3, 9) if 10**e <= max_size]
+        results = RunBenchmarks(sizes, stages)
+        with open(sys.argv[2], "w") as f:
+            json.dump(results, f, indent=2)
+        print(FormatResults(results))
+    elif len(sys.argv) == 4 and sys.argv[1] == "compare":
+        with open(sys.argv[2]) as f:
+            old = json.load(f)
+        with open(sys.argv[3]) as f:
+            new = json.load(f)
+        table, regressions = CompareResults(old, new)
+        print(table)
+        sys.exit(1 if regressions else 0)
+    else:
+        print(main.__doc__)
+
+
+def RunBenchmarks(sizes: list[int], stages: list[str] = STAGES, seed: int = 0) -> dict:
+    """
+    Benchmarks every stage at every genome size. Each (size, stage) pair runs in a fresh process so that its peak
+    RSS is not hidden by an earlier, larger run.
+    Input:
+        sizes: The genome sizes (in bases).
+        stages: The stages to benchmark (see STAGES).
+        seed: The random seed of the synthetic genomes.
+    Output:
+        A dictionary with the commit, the environment, and one result (as returned by BenchmarkStage) per pair.
+    """
+    for stage in stages:
+        if stage not in STAGES:
+            raise ValueError(f"Unknown benchmark stage: {stage}")
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        for stage in stages:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results.append(executor.submit(BenchmarkStage, stage, size, seed).result())
+    return {
+        "commit": CurrentCommit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def BenchmarkStage(stage: str, size: int, seed: int = 0, num_queries: int = 1000, repeat: int = 3) -> dict:
+    """
+    Times one stage of the index build (or matching) on a synthetic genome. Everything the stage needs is built
+    first and is not timed. The wall time is the best of repeat runs. The stage is then run again under tracemalloc
+    for the peak memory it allocates (tracemalloc slows pure Python code down, so the two are not measured together).
+    Input:
+        stage: The stage being measured (see STAGES).
+        size: The genome size (in bases).
+        seed: The random seed of the synthetic genome.
+        num_queries: The number of patterns matched by the "match" stage.
+        repeat: The number of timed runs.
+    Output:
+        A dictionary with the stage, size, wall time in seconds, peak RSS of the process in bytes, peak bytes
+        allocated by the stage, and for "match" the queries per second.
+    """
+    word = SyntheticGenome(size, seed)
+    run = StageFunction(stage, word, seed, num_queries)
+
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # ru_maxrss is in kilobytes on Linux.
+
+    tracemalloc.start()
+    run()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "stage": stage,
+        "size": size,
+        "seconds": seconds,
+        "peak_rss_bytes": peak_rss,
+        "traced_peak_bytes": traced_peak,
+    }
+    if stage == "match":
+        result["queries_per_second"] = num_queries / seconds
+    return result
+
+
+def StageFunction(stage: str, word: str, seed: int, num_queries: int):
+    """
+    Builds everything a stage needs and returns a function that runs the stage itself.
+    Input:
+        stage: The stage (see STAGES).
+        word: The genome (without "$").
+        seed: The random seed used to pick the patterns of the "match" stage.
+        num_queries: The number of patterns matched by the "match" stage.
+    """
+    text = word + "$"
+    if stage == "suffix_array":
+        return lambda: CreateSuffixArray(text)
+
+    suffix_arr = CreateSuffixArray(text)
+    if stage == "bwt":
+        return lambda: bwt(text, suffix_arr)
+    if stage == "partial_count":
+        return lambda: PartialCountMatrix(text, 128, suffix_arr)
+
+    bw_word = bwt(text, suffix_arr)
+    if stage == "char_positions":
+        return lambda: GetCharPositions(bw_word)
+    if stage == "occ_table":
+        return lambda: OccTable(bw_word)
+
+    ranks = GetRanks(bw_word)
+    partial_suffix = SamplePartialSuffixArray(text, 5, suffix_arr)
+    occ = OccTable(bw_word)
+    rng = np.random.default_rng(seed)
+    pattern_length = min(20, len(word))
+    patterns = [word[i : i + pattern_length] for i in rng.integers(0, len(word) - pattern_length + 1, num_queries)]
+    return lambda: [PartialSuffixArrayMatch(p, bw_word, ranks, partial_suffix, occ) for p in patterns]
+
+
+def SyntheticGenome(size: int, seed: int = 0) -> str:
+    """
+    Generates a random DNA word. The same size and seed always give the same word.
+    Input:
+        size: The number of bases.
+        seed: The random seed.
+    """
+    rng = np.random.default_rng(seed)
+    return np.frombuffer(b"ACGT", dtype=np.uint8)[rng.integers(0, 4, size)].tobytes().decode("ascii")
+
+
+def CurrentCommit() -> str:
+    """
+    Returns the short hash of the checked out git commit, or "unknown" outside a git repository.
+    """
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def FormatResults(results: dict) -> str:
+    """
+    Formats the results of one run as a table.
+    Input:
+        results: The results, as returned by RunBenchmarks.
+    """
+    lines = [f"commit {results['commit']}", f"{'stage':<16}{'size':>12}{'seconds':>12}{'peak RSS MB':>14}{'traced MB':>12}"]
+    for r in results["results"]:
+        line = (
+            f"{r['stage']:<16}{r['size']:>12}{r['seconds']:>12.4f}"
+            f"{r['peak_rss_bytes'] / 2**20:>14.1f}{r['traced_peak_bytes'] / 2**20:>12.1f}"
+        )
+        if "queries_per_second" in r:
+            line += f"  {r['queries_per_second']:.0f} queries/s"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def CompareResults(old: dict, new: dict, threshold: float = REGRESSION_RATIO) -> tuple[str, list[tuple[str, int]]]:
+    """
+    Compares two benchmark runs stage by stage. Only (stage, size) pairs that appear in both runs are compared.
+    Input:
+        old: The results of the earlier run, as returned by RunBenchmarks.
+        new: The results of the later run.
+        threshold: The new / old ratio of time or traced memory above which a stage counts as a regression. Times
+            under MIN_COMPARED_SECONDS are not compared.
+    Output:
+        The comparison table, and the (stage, size) pairs that regressed.
+    """
+    old_results = {(r["stage"], r["size"]): r for r in old["results"]}
+    lines = [
+        f"{old['commit']} -> {new['commit']}",
+        f"{'stage':<16}{'size':>12}{'old s':>10}{'new s':>10}{'time':>8}{'old MB':>10}{'new MB':>10}{'memory':>8}",
+    ]
+    regressions = []
+    for r in new["results"]:
+        key = (r["stage"], r["size"])
+        if key not in old_results:
+            continue
+        o = old_results[key]
+        time_ratio = r["seconds"] / max(o["seconds"], 1e-9)
+        memory_ratio = r["traced_peak_bytes"] / max(o["traced_peak_bytes"], 1)
+        line = (
+            f"{r['stage']:<16}{r['size']:>12}{o['seconds']:>10.4f}{r['seconds']:>10.4f}{time_ratio:>7.2f}x"
+            f"{o['traced_peak_bytes'] / 2**20:>10.1f}{r['traced_peak_bytes'] / 2**20:>10.1f}{memory_ratio:>7.2f}x"
+        )
+        slower = time_ratio > threshold and r["seconds"] >= MIN_COMPARED_SECONDS
+        if slower or memory_ratio > threshold:
+            regressions.append(key)
+            line += "  REGRESSION"
+        lines.append(line)
+    return "\n".join(lines), regressions
+
+
+if __name__ == "__main__":
+    main()
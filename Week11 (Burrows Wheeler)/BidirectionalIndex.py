@@ -0,0 +1,258 @@
+import os
+import numpy as np
+from BurrowsWheeler import *
+from BWTDecode import *
+from OccTable import OccTable
+
+
+def main():
+    dirname = os.path.dirname(__file__)
+    filepath = os.path.join(dirname, "inputs", "ApproximateMatching", "dataset_876296_6.txt")
+    with open(filepath) as f:
+        word = f.readline().strip()
+        patterns = f.readline().strip().split()
+        num_mismatches = int(f.readline().strip())
+    index = BidirectionalIndex(word)
+    answer = {pattern: index.SearchSchemeMatch(pattern, num_mismatches) for pattern in patterns}
+
+    answer_path = os.path.join(dirname, "answer.txt")
+    with open(answer_path, 'w') as f:
+        for key in answer:
+            f.write(f'{key}:')
+            for val in answer[key]:
+                f.write(f' {val}')
+            f.write('\n')
+
+
+class BidirectionalIndex:
+    """
+    A bidirectional FM-index: the Burrows-Wheeler transform of a word and of the reversed word, with their intervals
+    kept in sync. A match is held as an interval (fwd_top, rev_top, size):
+        - rows fwd_top to fwd_top + size of the word's Burrows-Wheeler matrix start with the match, and
+        - rows rev_top to rev_top + size of the reversed word's Burrows-Wheeler matrix start with the reversed match.
+    Extending the match to the left is a backward search step on the word, extending it to the right is a backward
+    search step on the reversed word, and the other interval is updated by counting the smaller letters in the
+    interval that was searched. A search can therefore start from any seed of a pattern and grow it either way.
+
+    Properties:
+        n: The length of the word (with "$").
+
+        alphabet: The sorted characters of the word (with "$").
+
+        suffix_arr: The suffix array of the word (with "$").
+
+        ranks: The rank of each character in the word, as returned by GetRanks.
+
+        occ: The rank (Occ) table of the bw transformed word.
+
+        rev_ranks: The rank of each character in the reversed word.
+
+        rev_occ: The rank (Occ) table of the bw transformed reversed word.
+    """
+    def __init__(self, word: "str | PackedSequence", checkpoint_step: int = 128):
+        if isinstance(word, PackedSequence):
+            rev_word = PackedSequence(AsciiCodes(word)[::-1]) + "$"
+        else:
+            rev_word = word[::-1] + "$"
+        word = word + "$"
+        self.n = len(word)
+        self.suffix_arr = BuildSuffixArray(AsciiCodes(word))
+        bw_word = bwt(word, self.suffix_arr)
+        self.ranks = GetRanks(bw_word)
+        self.occ = OccTable(bw_word, checkpoint_step)
+        rev_bw_word = bwt(rev_word)
+        self.rev_ranks = GetRanks(rev_bw_word)
+        self.rev_occ = OccTable(rev_bw_word, checkpoint_step)
+        self.alphabet = sorted(self.ranks.keys())
+        self.alphabet_codes = np.array([ord(letter) for letter in self.alphabet], dtype=np.uint8)
+
+    def FullInterval(self) -> tuple[int, int, int]:
+        """
+        Returns the interval of the empty match (every row of both matrices).
+        """
+        return 0, 0, self.n
+
+    def ExtendLeft(self, letter: str, interval: tuple[int, int, int]) -> tuple[int, int, int]:
+        """
+        Prepends a letter to the match.
+        Input:
+            letter: The letter being prepended.
+            interval: The (fwd_top, rev_top, size) interval of the current match.
+        Output:
+            The interval of the extended match. size is 0 when it does not occur.
+        """
+        return self.ExtendAll(interval, "left").get(letter, (0, 0, 0))
+
+    def ExtendRight(self, letter: str, interval: tuple[int, int, int]) -> tuple[int, int, int]:
+        """
+        Appends a letter to the match.
+        Input:
+            letter: The letter being appended.
+            interval: The (fwd_top, rev_top, size) interval of the current match.
+        Output:
+            The interval of the extended match. size is 0 when it does not occur.
+        """
+        return self.ExtendAll(interval, "right").get(letter, (0, 0, 0))
+
+    def ExtendAll(self, interval: tuple[int, int, int], direction: str) -> dict[str, tuple[int, int, int]]:
+        """
+        Extends the match by every letter of the alphabet at once. The counts of every letter at the top and bottom of
+        the searched interval come from two vectorised Occ lookups.
+        Input:
+            interval: The (fwd_top, rev_top, size) interval of the current match.
+            direction: "left" to prepend the letters, "right" to append them.
+        Output:
+            A dictionary from each letter (other than "$") that extends the match to the extended interval.
+        """
+        fwd_top, rev_top, size = interval
+        if direction == "left":
+            occ, ranks, top, other_top = self.occ, self.ranks, fwd_top, rev_top
+        elif direction == "right":
+            occ, ranks, top, other_top = self.rev_occ, self.rev_ranks, rev_top, fwd_top
+        else:
+            raise ValueError(f"Unknown direction: {direction}")
+
+        num_letters = len(self.alphabet_codes)
+        counts_top = occ.CountMany(self.alphabet_codes, np.full(num_letters, top))
+        counts_bot = occ.CountMany(self.alphabet_codes, np.full(num_letters, top + size))
+        in_interval = counts_bot - counts_top
+        # Rows of the other matrix are ordered by the letter being added, so the letters that sort before it
+        # come first.
+        smaller = np.cumsum(in_interval) - in_interval
+
+        extended = {}
+        for j, letter in enumerate(self.alphabet):
+            if letter == "$" or in_interval[j] == 0:
+                continue
+            new_top = ranks[letter] + int(counts_top[j])
+            new_other_top = other_top + int(smaller[j])
+            if direction == "left":
+                extended[letter] = (new_top, new_other_top, int(in_interval[j]))
+            else:
+                extended[letter] = (new_other_top, new_top, int(in_interval[j]))
+        return extended
+
+    def Search(self, pattern: str, start: int = 0) -> tuple[int, int, int]:
+        """
+        Finds the interval of a pattern, starting from the seed pattern[start] and growing it right to the end of the
+        pattern, then left to the beginning.
+        Input:
+            pattern: The pattern being searched for.
+            start: The position of the pattern the search starts from.
+        Output:
+            The (fwd_top, rev_top, size) interval of the pattern. size is 0 when it does not occur.
+        """
+        interval = self.FullInterval()
+        for letter in pattern[start:]:
+            interval = self.ExtendRight(letter, interval)
+            if interval[2] == 0:
+                return interval
+        for letter in reversed(pattern[:start]):
+            interval = self.ExtendLeft(letter, interval)
+            if interval[2] == 0:
+                return interval
+        return interval
+
+    def Locate(self, interval: tuple[int, int, int]) -> list[int]:
+        """
+        Returns the starting positions in the word of every match in an interval.
+        Input:
+            interval: The (fwd_top, rev_top, size) interval of a match.
+        """
+        fwd_top, _, size = interval
+        return self.suffix_arr[fwd_top : fwd_top + size].tolist()
+
+    def SearchSchemeMatch(self, pattern: str, num_mismatches: int) -> list[int]:
+        """
+        Finds every match of a pattern with at most num_mismatches mismatches using the search schemes from
+        PigeonholeSearchSchemes.
+        Input:
+            pattern: The pattern being searched for.
+            num_mismatches: The number of mismatches allowed.
+        Output:
+            The sorted locations of the approximate matches in the word.
+        """
+        if len(pattern) <= num_mismatches:  # Every window of the word is close enough.
+            return list(range(self.n - len(pattern)))
+        num_parts = num_mismatches + 1
+        bounds = [j * len(pattern) // num_parts for j in range(num_parts + 1)]
+        parts = [(bounds[j], bounds[j + 1]) for j in range(num_parts)]
+        locations = set()
+        for order, lower, upper in PigeonholeSearchSchemes(num_mismatches):
+            locations.update(self.RunSearch(pattern, parts, order, lower, upper))
+        return sorted(locations)
+
+    def RunSearch(
+        self,
+        pattern: str,
+        parts: list[tuple[int, int]],
+        order: list[int],
+        lower: list[int],
+        upper: list[int],
+    ) -> list[int]:
+        """
+        Runs one search of a search scheme. The parts of the pattern are matched in the given order. The first part
+        is grown to the right, and every later part is added on the side it lies on, so the matched parts are always
+        contiguous. After the t'th part has been matched, the total number of mismatches must be between lower[t]
+        and upper[t]. A branch is dropped as soon as it goes over upper[t].
+        Input:
+            pattern: The pattern being searched for.
+            parts: The (start, end) positions of each part of the pattern. No part may be empty.
+            order: The order the parts are matched in. order[0] can be any part, and every later part must be next to
+                the parts matched before it.
+            lower: The lower bound on the total mismatches after each part.
+            upper: The upper bound on the total mismatches after each part.
+        Output:
+            The locations of the matches found by this search.
+        """
+        steps = []  # (position in pattern, direction, index into order) for every letter, in search order.
+        for t, part in enumerate(order):
+            start, end = parts[part]
+            if t == 0 or part > order[0]:
+                steps.extend((i, "right", t) for i in range(start, end))
+            else:
+                steps.extend((i, "left", t) for i in range(end - 1, start - 1, -1))
+        part_ends = {t: s for s, (_, _, t) in enumerate(steps)}
+
+        locations = []
+        # Each entry: (number of steps done, mismatches so far, interval).
+        stack = [(0, 0, self.FullInterval())]
+        while stack:
+            s, mismatches, interval = stack.pop()
+            if s == len(steps):
+                locations.extend(self.Locate(interval))
+                continue
+            i, direction, t = steps[s]
+            for letter, new_interval in self.ExtendAll(interval, direction).items():
+                new_mismatches = mismatches + (letter != pattern[i])
+                if new_mismatches > upper[t]:
+                    continue
+                if part_ends[t] == s and new_mismatches < lower[t]:
+                    continue
+                stack.append((s + 1, new_mismatches, new_interval))
+        return locations
+
+
+def PigeonholeSearchSchemes(num_mismatches: int) -> list[tuple[list[int], list[int], list[int]]]:
+    """
+    Builds search schemes for k-mismatch matching with the pattern split into k + 1 parts. Any match has at least
+    one exact part. Search j covers the matches whose first exact part is part j: it starts from part j with no
+    mismatches, extends right over parts j + 1 to k with at most k - j mismatches (each part before j holds at least
+    one), then extends left over parts j - 1 to 0, each of which adds at least one mismatch.
+    Input:
+        num_mismatches: The number of mismatches allowed (k).
+    Output:
+        A list of (order, lower, upper) searches, as taken by BidirectionalIndex.RunSearch.
+    """
+    k = num_mismatches
+    schemes = []
+    for j in range(k + 1):
+        order = [j] + list(range(j + 1, k + 1)) + list(range(j - 1, -1, -1))
+        lower = [0] * (k + 1 - j) + list(range(1, j + 1))
+        upper = [0] + [k - j] * (k - j) + [k] * j
+        schemes.append((order, lower, upper))
+    return schemes
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
-import os
+import os, sys
+import numpy as np
+# SuffixArrayConstruction is shared with Week10 rather than copied.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Week10 (Suffix Trees)"))
+from SuffixArrayConstruction import BuildSuffixArray
+from PackedDNA import PackedSequence, AsciiCodes
 
 def main():
     dirpath = os.path.dirname(__file__)
@@ -14,20 +19,57 @@ def ReadData(filepath):
     with open(filepath) as f:
         return f.readline().strip()
 
-def bwt(word: str) -> str:
+def bwt(word: "str | PackedSequence", suffix_arr: np.ndarray = None) -> "str | PackedSequence":
     """
-    Returns the Burrows-Wheeler Transform on a word.
+    Returns the Burrows-Wheeler Transform on a word. If the word ends with a unique smallest character (e.g. "$") the
+    transform is read off the suffix array, otherwise every rotation of the word is sorted.
     Input:
         word: the word we are performing Burrow's Wheeler on.
+        suffix_arr: (Optional) The suffix array of word, if it has already been built.
     Output:
-        The Burrows-Wheeler Tranform.
+        The Burrows-Wheeler Tranform. A PackedSequence if word is a PackedSequence.
     """
+    if isinstance(word, PackedSequence):
+        if HasSentinel(word):
+            return PackedSequence(np.frombuffer(BWTFromSuffixArray(word, suffix_arr), dtype=np.uint8))
+        return PackedSequence(bwt(str(word)))
+    if HasSentinel(word):
+        return BWTFromSuffixArray(word, suffix_arr).decode("ascii")
+
     word_rotations = [word[i:]+word[:i] for i in range(len(word))]
     word_rotations = sorted(word_rotations)
-    bwt = ""
+    bw_word = ""
     for w in word_rotations:
-        bwt = "".join([bwt, w[-1]])
-    return bwt
+        bw_word = "".join([bw_word, w[-1]])
+    return bw_word
+
+def BWTFromSuffixArray(word: "str | PackedSequence", suffix_arr: np.ndarray = None) -> bytes:
+    """
+    Builds the Burrows-Wheeler Transform of a word directly from its suffix array. The last character of the rotation
+    starting at suffix_arr[i] is word[suffix_arr[i] - 1], so no rotation is ever built.
+    Input:
+        word: An ascii word that ends with a unique smallest character (e.g. "$").
+        suffix_arr: (Optional) The suffix array of word, if it has already been built.
+    Output:
+        The Burrows-Wheeler Transform as a byte buffer (one byte per character).
+    """
+    text = AsciiCodes(word)
+    if suffix_arr is None:
+        suffix_arr = BuildSuffixArray(text)
+    return text[suffix_arr - 1].tobytes()
+
+def HasSentinel(word: "str | PackedSequence") -> bool:
+    """
+    Checks if a word ends with a unique character that is smaller than every other character in the word. For such
+    words sorting the suffixes gives the same order as sorting the rotations.
+    Input:
+        word: The word being checked.
+    """
+    if len(word) == 0 or (isinstance(word, str) and not word.isascii()):
+        return False
+    codes = AsciiCodes(word)
+    sentinel = codes[-1]
+    return np.count_nonzero(codes == sentinel) == 1 and codes.min() == sentinel
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,316 @@
+import sys, mmap, struct
+import numpy as np
+from SuffixArrayMatch import *
+from OccTable import *
+from ApproximateMatching import BacktrackRows
+from SequenceReader import ReadReference
+
+FM_INDEX_MAGIC = b"FMINDEX\0"
+FM_INDEX_VERSION = 1
+# Version 1 layout, every section 8-byte aligned: header, alphabet (uint8), ranks (int64), Occ table, reversed ranks
+# (int64), reversed Occ table, suffix array sample rows (int64), sample positions (int64). An Occ table is its own
+# header, its checkpoints (int64), then either the packed word (uint64), escape positions (int64) and escape
+# characters (uint8), or the word at one byte per character.
+# magic, version, alphabet size, word length, k, checkpoint step, number of suffix array samples.
+FM_INDEX_HEADER = struct.Struct("<8sIIQQQQ")
+# Whether the word of an Occ table is packed (PackedSequence) or stored one byte per character, number of escapes.
+OCC_TABLE_HEADER = struct.Struct("<QQ")
+
+
+def main():
+    """
+    Index-build command:
+        python FMIndex.py <reference file> <index file> [k] [checkpoint step]
+    The reference file is a FASTA file (optionally gzip compressed) or holds the word on its first line (the same format
+    read by SuffixArrayMatch.ReadData).
+    """
+    if len(sys.argv) < 3:
+        print("Usage: python FMIndex.py <reference file> <index file> [k] [checkpoint step]")
+        return
+    word = ReadReference(sys.argv[1])
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    checkpoint_step = int(sys.argv[4]) if len(sys.argv) > 4 else 128
+    BuildFMIndexFile(word, sys.argv[2], k, checkpoint_step)
+    for key, val in FMIndex(sys.argv[2]).Report().items():
+        print(f"{key}: {val}")
+
+
+class FMIndex:
+    """
+    An FM-index loaded from a file written by SaveFMIndex. All arrays are zero-copy views into a read-only memory
+    map, so loading is fast and the pages are shared between every process that maps the same file.
+
+    Properties:
+        alphabet: The sorted characters that appear in the word.
+
+        ranks: The rank (C-array) of each character, as returned by GetRanks.
+
+        occ: The OccTable of the Burrows-Wheeler transformed word, built over the mapped checkpoints and packed word.
+
+        rev_ranks: The ranks of the Burrows-Wheeler transformed reversed word.
+
+        rev_occ: The OccTable of the Burrows-Wheeler transformed reversed word, used to bound the mismatches of
+            ApproximateMatch (see LowerBoundArray).
+
+        partial_suffix: The partial suffix array.
+
+        k: The increment size of the partial suffix array.
+
+        checkpoint_step: The distance between checkpoints of the Occ table.
+    """
+    def __init__(self, filepath: str):
+        with open(filepath, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, sigma, n, k, checkpoint_step, num_samples = FM_INDEX_HEADER.unpack_from(self.buffer, 0)
+        if magic != FM_INDEX_MAGIC:
+            raise ValueError(f"{filepath} is not an FM-index file.")
+        if version != FM_INDEX_VERSION:
+            raise ValueError(f"{filepath} has FM-index version {version}, expected {FM_INDEX_VERSION}.")
+
+        self.n = n
+        self.k = k
+        self.checkpoint_step = checkpoint_step
+        offset = FM_INDEX_HEADER.size
+        codes, offset = ReadArray(self.buffer, offset, np.uint8, sigma)
+        rank_values, offset = ReadArray(self.buffer, offset, np.int64, sigma)
+        self.occ, offset = ReadOccTable(self.buffer, offset, n, checkpoint_step, codes)
+        rev_rank_values, offset = ReadArray(self.buffer, offset, np.int64, sigma)
+        self.rev_occ, offset = ReadOccTable(self.buffer, offset, n, checkpoint_step, codes)
+        sample_rows, offset = ReadArray(self.buffer, offset, np.int64, num_samples)
+        sample_positions, offset = ReadArray(self.buffer, offset, np.int64, num_samples)
+
+        self.alphabet = [chr(c) for c in codes]
+        self.ranks = {letter: int(r) for letter, r in zip(self.alphabet, rank_values)}
+        self.rev_ranks = {letter: int(r) for letter, r in zip(self.alphabet, rev_rank_values)}
+        self.partial_suffix = SampledSuffixArray(sample_rows, sample_positions)
+
+    def Count(self, letter: str, i: int) -> int:
+        """
+        Returns the number of times a letter appears in the Burrows-Wheeler transformed word before index i.
+        Input:
+            letter: The letter being counted.
+            i: The index to count until (0 <= i <= n).
+        """
+        return self.occ.Count(letter, i)
+
+    def LastToFirst(self, i: int) -> int:
+        """
+        Maps row i of the last column to the row of the same character in the first column.
+        Input:
+            i: The row of the Burrows-Wheeler matrix.
+        """
+        letter = chr(self.occ.CharsAt(np.array([i]))[0])
+        return self.ranks[letter] + self.Count(letter, i)
+
+    def TopBot(self, pattern: str) -> tuple[int, int]:
+        """
+        Performs backward search for a pattern.
+        Input:
+            pattern: The pattern being searched for.
+        Output:
+            The top (inclusive) and bot (exclusive) rows of the Burrows-Wheeler matrix that start with pattern.
+            top == bot when the pattern does not occur.
+        """
+        top, bot = 0, self.n
+        for letter in reversed(pattern):
+            if letter not in self.ranks:
+                return 0, 0
+            top = self.ranks[letter] + self.Count(letter, top)
+            bot = self.ranks[letter] + self.Count(letter, bot)
+            if top >= bot:
+                return 0, 0
+        return top, bot
+
+    def Locate(self, rows: "int | np.ndarray") -> "int | np.ndarray":
+        """
+        Gets the starting positions in the word of rows of the Burrows-Wheeler matrix with BatchLocate, which walks
+        all of them back to their nearest sampled suffixes together.
+        Input:
+            rows: A row, or an array of rows.
+        Output:
+            The starting position of the row, or an int64 array with the starting position of each row.
+        """
+        if np.ndim(rows) == 0:
+            return int(self.Locate(np.array([rows], dtype=np.int64))[0])
+        return BatchLocate(np.asarray(rows, dtype=np.int64), self.ranks, self.partial_suffix, self.occ)
+
+    def Match(self, pattern: str) -> list[int]:
+        """
+        Finds the starting positions of every exact match of a pattern.
+        Input:
+            pattern: The pattern being matched.
+        """
+        top, bot = self.TopBot(pattern)
+        return self.Locate(np.arange(top, bot, dtype=np.int64)).tolist()
+
+    def ApproximateMatch(self, pattern: str, num_mismatches: int) -> list[int]:
+        """
+        Finds the starting positions of every match of a pattern with at most num_mismatches mismatches, by
+        backtracking backward search pruned with the reversed word's index (see BacktrackRows). The rows of every
+        match are located together at the end.
+        Input:
+            pattern: The pattern being matched.
+            num_mismatches: The number of mismatches allowed.
+        Output:
+            The sorted starting positions.
+        """
+        rows = BacktrackRows(pattern, num_mismatches, self.ranks, self.occ, self.rev_ranks, self.rev_occ)
+        return np.sort(self.Locate(rows)).tolist()
+
+    def Report(self) -> dict[str, float]:
+        """
+        Reports the memory footprint of each section of the index and the expected cost of locating one match. The
+        reversed word's BWT and Occ table (used only by ApproximateMatch) are counted separately, and file_bytes is
+        the size of the whole mapped file.
+        """
+        sigma = len(self.alphabet)
+        report = {
+            "rank_bytes": sigma + 2 * 8 * sigma,  # Alphabet, ranks and reversed ranks.
+            "bwt_bytes": self.occ.NumBytes() - self.occ.checkpoints.nbytes,
+            "occ_bytes": self.occ.checkpoints.nbytes,
+            "reverse_bwt_bytes": self.rev_occ.NumBytes() - self.rev_occ.checkpoints.nbytes,
+            "reverse_occ_bytes": self.rev_occ.checkpoints.nbytes,
+            "suffix_sample_bytes": self.partial_suffix.rows.nbytes + self.partial_suffix.positions.nbytes,
+        }
+        report["total_bytes"] = sum(report.values())
+        report["bytes_per_base"] = report["total_bytes"] / max(self.n, 1)
+        report["file_bytes"] = len(self.buffer)
+        report.update(LocateCost(self.k, self.checkpoint_step))
+        return report
+
+
+def BuildFMIndexFile(word: "str | PackedSequence", filepath: str, k: int = 5, checkpoint_step: int = 128):
+    """
+    Builds the Burrows-Wheeler transform, ranks, Occ table and partial suffix array of a word, and the ranks and Occ
+    table of the reversed word, and saves them as an FM-index file.
+    Input:
+        word: The word being indexed ("$" is appended).
+        filepath: Where to save the index.
+        k: The increment size of the partial suffix array.
+        checkpoint_step: The increment size of the partial count matrix.
+    """
+    word = word + "$"
+    suffix_arr = BuildSuffixArray(AsciiCodes(word))
+    bw_word = bwt(word, suffix_arr)
+    ranks = GetRanks(bw_word)
+    partial_suffix = SamplePartialSuffixArray(word, k, suffix_arr)
+    occ = OccTable(bw_word, checkpoint_step)
+    rev_word = word[-2::-1] + "$"
+    rev_bw_word = bwt(rev_word, BuildSuffixArray(AsciiCodes(rev_word)))
+    rev_occ = OccTable(rev_bw_word, checkpoint_step)
+    SaveFMIndex(filepath, ranks, occ, GetRanks(rev_bw_word), rev_occ, partial_suffix, k)
+
+
+def SaveFMIndex(
+    filepath: str,
+    ranks: dict[str, int],
+    occ: OccTable,
+    rev_ranks: dict[str, int],
+    rev_occ: OccTable,
+    partial_suffix: SampledSuffixArray,
+    k: int,
+):
+    """
+    Serialises an FM-index into a versioned binary file that can be memory mapped by FMIndex. Every section is
+    8-byte aligned so it can be viewed as a numpy array without copying. The arrays are written as they are, with no
+    conversion to Python lists.
+    Input:
+        filepath: Where to save the index.
+        ranks: The rank of each character, as returned by GetRanks.
+        occ: The OccTable of the Burrows-Wheeler transformed word. Its checkpoints and its packed word (or its
+            characters, if the word is not DNA) are saved, so the loaded index counts with the same code.
+        rev_ranks: The ranks of the Burrows-Wheeler transformed reversed word.
+        rev_occ: The OccTable of the Burrows-Wheeler transformed reversed word.
+        partial_suffix: The partial suffix array, as returned by SamplePartialSuffixArray.
+        k: The increment size of the partial suffix array.
+    """
+    alphabet = sorted(ranks.keys())
+    header = FM_INDEX_HEADER.pack(
+        FM_INDEX_MAGIC, FM_INDEX_VERSION, len(alphabet), occ.n, k, occ.checkpoint_step, len(partial_suffix)
+    )
+    sections = [
+        header,
+        np.array([ord(letter) for letter in alphabet], dtype=np.uint8),
+        np.array([ranks[letter] for letter in alphabet], dtype=np.int64),
+        *OccTableSections(occ),
+        np.array([rev_ranks[letter] for letter in alphabet], dtype=np.int64),
+        *OccTableSections(rev_occ),
+        np.asarray(partial_suffix.rows, dtype=np.int64),
+        np.asarray(partial_suffix.positions, dtype=np.int64),
+    ]
+    with open(filepath, "wb") as f:
+        for section in sections:
+            data = section if isinstance(section, bytes) else section.tobytes()
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+
+
+def OccTableSections(occ: OccTable) -> list:
+    """
+    Lists the sections an Occ table is saved as: a header, the checkpoints, and then either the packed word and its
+    escape list or the characters of the word.
+    Input:
+        occ: The Occ table being saved.
+    """
+    checkpoints = np.ascontiguousarray(occ.checkpoints, dtype=np.int64)
+    if occ.sequence is None:
+        return [OCC_TABLE_HEADER.pack(0, 0), checkpoints, np.asarray(occ.chars, dtype=np.uint8)]
+    sequence = occ.sequence
+    return [
+        OCC_TABLE_HEADER.pack(1, len(sequence.escape_positions)),
+        checkpoints,
+        np.asarray(sequence.packed, dtype=np.uint64),
+        np.asarray(sequence.escape_positions, dtype=np.int64),
+        np.asarray(sequence.escape_chars, dtype=np.uint8),
+    ]
+
+
+def ReadOccTable(
+    buffer: mmap.mmap, offset: int, n: int, checkpoint_step: int, alphabet_codes: np.ndarray
+) -> tuple[OccTable, int]:
+    """
+    Loads an Occ table saved as the sections listed by OccTableSections. The checkpoints and the word are views into
+    the buffer.
+    Input:
+        buffer: The memory mapped file.
+        offset: The byte offset of the Occ table header.
+        n: The length of the word.
+        checkpoint_step: The distance between checkpoints.
+        alphabet_codes: The sorted ascii codes of the characters that appear in the word.
+    Output:
+        The Occ table, and the offset of the next section.
+    """
+    is_packed, num_escapes = OCC_TABLE_HEADER.unpack_from(buffer, offset)
+    offset += OCC_TABLE_HEADER.size
+    sigma = len(alphabet_codes)
+    checkpoints, offset = ReadArray(buffer, offset, np.int64, (n // checkpoint_step + 1) * sigma)
+    checkpoints = checkpoints.reshape(-1, sigma)
+    if not is_packed:
+        chars, offset = ReadArray(buffer, offset, np.uint8, n)
+        return LoadOccTable(n, checkpoint_step, alphabet_codes, checkpoints, chars=chars), offset
+    packed, offset = ReadArray(buffer, offset, np.uint64, -(-n // BASES_PER_WORD))
+    escape_positions, offset = ReadArray(buffer, offset, np.int64, num_escapes)
+    escape_chars, offset = ReadArray(buffer, offset, np.uint8, num_escapes)
+    sequence = LoadPackedSequence(n, packed, escape_positions, escape_chars)
+    return LoadOccTable(n, checkpoint_step, alphabet_codes, checkpoints, sequence), offset
+
+
+def ReadArray(buffer: mmap.mmap, offset: int, dtype: type, count: int) -> tuple[np.ndarray, int]:
+    """
+    Views one section of an FM-index file as a numpy array.
+    Input:
+        buffer: The memory mapped file.
+        offset: The byte offset of the section.
+        dtype: The numpy type of the section.
+        count: The number of elements in the section.
+    Output:
+        The array, and the offset of the next (8-byte aligned) section.
+    """
+    arr = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+    offset += arr.nbytes
+    return arr, offset + (-offset % 8)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import numpy as np
+from PackedDNA import *
+
+MAX_ESCAPE_FRACTION = 16  # Words where more than 1 in 16 characters is not A, C, G, T are not packed.
+
+
+class OccTable:
+    """
+    Rank (Occ) structure for a Burrows-Wheeler transformed word. The number of times each letter appears before every
+    checkpoint is stored, and the count between the checkpoint and the query index is done with popcounts over the
+    word packed at 2 bits per base. A count therefore takes O(checkpoint_step / 32) operations no matter how long the
+    word is.
+
+    DNA words are stored as a PackedSequence. Characters other than A, C, G, T (the "$" sentinel, "N") are counted
+    from the sequence's escape list, which stays small for real DNA. Words with many other characters fall back to
+    counting the characters between the checkpoint and the query index with numpy.
+
+    Properties:
+        alphabet: The sorted characters that appear in the word.
+
+        checkpoint_step: The distance between checkpoints. A multiple of 32.
+
+        checkpoints: checkpoints[c, j] is the number of times alphabet[j] appears before index c * checkpoint_step.
+
+        sequence: The word as a PackedSequence (None if the word is not DNA).
+
+        escapes: The sorted positions of each non-DNA character of a packed word.
+    """
+    def __init__(self, bw_word: "str | PackedSequence", checkpoint_step: int = 128):
+        if checkpoint_step <= 0 or checkpoint_step % BASES_PER_WORD != 0:
+            raise ValueError(f"checkpoint_step must be a positive multiple of {BASES_PER_WORD}.")
+        chars = AsciiCodes(bw_word)
+        alphabet_codes = np.unique(chars)
+        lookup = np.zeros(256, dtype=np.uint8)
+        lookup[alphabet_codes] = np.arange(len(alphabet_codes))
+        checkpoints = BuildCheckpoints(lookup[chars], len(alphabet_codes), checkpoint_step)
+
+        sequence = bw_word if isinstance(bw_word, PackedSequence) else PackedSequence(chars)
+        if len(sequence.escape_positions) > max(1, len(chars) // MAX_ESCAPE_FRACTION):
+            sequence = None
+        self.SetArrays(len(chars), checkpoint_step, alphabet_codes, checkpoints, sequence, chars)
+
+    def SetArrays(
+        self,
+        n: int,
+        checkpoint_step: int,
+        alphabet_codes: np.ndarray,
+        checkpoints: np.ndarray,
+        sequence: PackedSequence = None,
+        chars: np.ndarray = None,
+    ):
+        """
+        Sets the tables of the Occ table from arrays that have already been built.
+        Input:
+            n: The length of the word.
+            checkpoint_step: The distance between checkpoints.
+            alphabet_codes: The sorted ascii codes of the characters that appear in the word.
+            checkpoints: The checkpoint counts, as returned by BuildCheckpoints.
+            sequence: The word as a PackedSequence, or None if the word is stored unpacked.
+            chars: The ascii codes of the word (only kept when sequence is None).
+        """
+        self.n = n
+        self.checkpoint_step = checkpoint_step
+        self.alphabet = [chr(c) for c in alphabet_codes]
+        self.letter_idx = {letter: i for i, letter in enumerate(self.alphabet)}
+        self.checkpoints = checkpoints
+        self.sequence = sequence
+        if sequence is not None:
+            self.escapes = {
+                chr(c): sequence.escape_positions[sequence.escape_chars == c] for c in np.unique(sequence.escape_chars)
+            }
+            self.chars = None
+        else:
+            self.escapes = {}
+            self.chars = chars
+
+    def Count(self, letter: str, i: int) -> int:
+        """
+        Returns the number of times a letter appears in the word before index i.
+        Input:
+            letter: The letter being counted.
+            i: The index to count until (0 <= i <= len(word)).
+        """
+        if letter not in self.letter_idx:
+            return 0
+        if letter in self.escapes:
+            return int(np.searchsorted(self.escapes[letter], i))
+
+        checkpoint = i // self.checkpoint_step
+        start = checkpoint * self.checkpoint_step
+        count = int(self.checkpoints[checkpoint, self.letter_idx[letter]])
+        if self.sequence is None:
+            return count + int(np.count_nonzero(self.chars[start:i] == ord(letter)))
+
+        code = DNA_CODES[letter]
+        packed = self.sequence.packed
+        last_word, remainder = divmod(i, BASES_PER_WORD)
+        for w in range(start // BASES_PER_WORD, last_word):
+            count += MatchingBases(int(packed[w]), code).bit_count()
+        if remainder:
+            mask = (1 << (2 * remainder)) - 1
+            count += (MatchingBases(int(packed[last_word]), code) & mask).bit_count()
+        if code == 0:  # Escapes are packed as "A".
+            escape_positions = self.sequence.escape_positions
+            count -= int(np.searchsorted(escape_positions, i) - np.searchsorted(escape_positions, start))
+        return count
+
+    def CountMany(self, letters: np.ndarray, i: np.ndarray) -> np.ndarray:
+        """
+        Vectorised Count for many (letter, index) pairs at once.
+        Input:
+            letters: The ascii codes of the letters being counted.
+            i: The indexes to count until.
+        Output:
+            An int64 array where element j is the number of times letters[j] appears before i[j].
+        """
+        letters = np.asarray(letters, dtype=np.uint8)
+        i = np.asarray(i, dtype=np.int64)
+        if self.sequence is None:
+            return np.array([self.Count(chr(c), j) for c, j in zip(letters, i)], dtype=np.int64)
+
+        letter_lookup = np.full(256, -1, dtype=np.int64)
+        code_lookup = np.zeros(256, dtype=np.uint64)
+        for letter, idx in self.letter_idx.items():
+            letter_lookup[ord(letter)] = idx
+            code_lookup[ord(letter)] = DNA_CODES.get(letter, 0)
+        letter_idx = letter_lookup[letters]
+        known = letter_idx >= 0
+        codes = code_lookup[letters]
+
+        packed = self.sequence.packed
+        checkpoint = i // self.checkpoint_step
+        start = checkpoint * self.checkpoint_step
+        counts = self.checkpoints[checkpoint, np.maximum(letter_idx, 0)]
+        last_word, remainder = np.divmod(i, BASES_PER_WORD)
+        partial_mask = (np.uint64(1) << (2 * remainder).astype(np.uint64)) - np.uint64(1)
+        for offset in range(self.checkpoint_step // BASES_PER_WORD):
+            w = start // BASES_PER_WORD + offset
+            matches = MatchingWords(packed[np.minimum(w, len(packed) - 1)], codes)
+            mask = np.where(w < last_word, np.uint64(FULL_WORD), np.where(w == last_word, partial_mask, 0))
+            counts += np.bitwise_count(matches & mask.astype(np.uint64)).astype(np.int64)
+        escape_positions = self.sequence.escape_positions
+        counts -= (codes == 0) * (np.searchsorted(escape_positions, i) - np.searchsorted(escape_positions, start))
+
+        for letter, positions in self.escapes.items():
+            is_escape = letters == ord(letter)
+            counts[is_escape] = np.searchsorted(positions, i[is_escape])
+        counts[~known] = 0
+        return counts
+
+    def CharsAt(self, i: np.ndarray) -> np.ndarray:
+        """
+        Vectorised lookup of the characters at many indexes of the word.
+        Input:
+            i: The indexes.
+        Output:
+            The ascii codes of the characters.
+        """
+        if self.sequence is None:
+            return self.chars[np.asarray(i, dtype=np.int64)]
+        return self.sequence.CodesAt(i)
+
+    def NumBytes(self) -> int:
+        """
+        Returns the memory used by the checkpoints and the packed (or raw) word.
+        """
+        stored_word = self.sequence.NumBytes() if self.sequence is not None else self.chars.nbytes
+        return self.checkpoints.nbytes + stored_word
+
+    def TopBot(self, letter: str, top: int, bot: int, ranks: dict[str, int]) -> tuple[int, int]:
+        """
+        Finds the top and bot index for the next step of backward search.
+        Input:
+            letter: The letter being prepended to the current match.
+            top: The current top index (inclusive).
+            bot: The current bot index (exclusive).
+            ranks: The rank of each character, as returned by GetRanks.
+        Output:
+            The new top and bot index. top == bot when there are no matches.
+        """
+        if letter not in ranks:
+            return 0, 0
+        return ranks[letter] + self.Count(letter, top), ranks[letter] + self.Count(letter, bot)
+
+
+def LoadOccTable(
+    n: int,
+    checkpoint_step: int,
+    alphabet_codes: np.ndarray,
+    checkpoints: np.ndarray,
+    sequence: PackedSequence = None,
+    chars: np.ndarray = None,
+) -> OccTable:
+    """
+    Creates an Occ table from arrays that have already been built, e.g. views into a memory mapped FM-index file,
+    without counting the word again. The arguments are the same as OccTable.SetArrays.
+    """
+    occ = OccTable.__new__(OccTable)
+    occ.SetArrays(n, checkpoint_step, alphabet_codes, checkpoints, sequence, chars)
+    return occ
+
+
+def BuildCheckpoints(letter_idx: np.ndarray, sigma: int, step: int) -> np.ndarray:
+    """
+    Counts how many times each letter appears before every multiple of step.
+    Input:
+        letter_idx: The word with every character replaced by its index in the alphabet.
+        sigma: The size of the alphabet.
+        step: The distance between checkpoints.
+    Output:
+        An array of shape (len(word) // step + 1, sigma).
+    """
+    n = len(letter_idx)
+    num_blocks = -(-n // step)
+    blocks = np.full(num_blocks * step, sigma, dtype=np.uint8)  # sigma marks padding past the end of the word.
+    blocks[:n] = letter_idx
+    blocks = blocks.reshape(num_blocks, step)
+    checkpoints = np.zeros((n // step + 1, sigma), dtype=np.int64)
+    for j in range(sigma):
+        checkpoints[1:, j] = np.cumsum(np.count_nonzero(blocks == j, axis=1))[: n // step]
+    return checkpoints
@@ -0,0 +1,218 @@
+import numpy as np
+
+DNA_CODES = {"A": 0, "C": 1, "G": 2, "T": 3}
+DNA_LETTERS = np.frombuffer(b"ACGT", dtype=np.uint8)
+BASES_PER_WORD = 32  # 2 bits per base in a 64 bit word.
+LOW_BITS = 0x5555555555555555  # The low bit of every 2 bit field.
+FULL_WORD = 0xFFFFFFFFFFFFFFFF
+PACK_BLOCK_WORDS = 1 << 12  # PackDNA packs this many words at a time.
+
+
+class PackedSequence:
+    """
+    A DNA sequence stored at 2 bits per base. Characters other than A, C, G, T (e.g. "N" or the "$" sentinel) are
+    packed as "A" and recorded in an escape list, so any ascii sequence can be stored, but only DNA is compact.
+
+    Supports len(), indexing (seq[i] is a one character string), slicing (seq[i:j] is a string), iteration, and
+    adding a string (seq + "$" is a new PackedSequence), so it can be passed where the Week11 code expects a word.
+
+    Properties:
+        n: The length of the sequence.
+
+        packed: The bases packed 32 to a uint64. Base j of word w is stored in bits 2j and 2j+1 of element w.
+
+        escape_positions: The sorted positions of the non-DNA characters.
+
+        escape_chars: The ascii codes of the non-DNA characters.
+    """
+    def __init__(self, sequence: "str | np.ndarray"):
+        codes = AsciiCodes(sequence)
+        self.n = len(codes)
+        self.packed = PackDNA(codes)
+        is_escape = np.ones(256, dtype=bool)
+        is_escape[DNA_LETTERS] = False
+        self.escape_positions = np.flatnonzero(is_escape[codes])
+        self.escape_chars = codes[self.escape_positions]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, key: "int | slice") -> str:
+        if isinstance(key, slice):
+            return self.Codes()[key].tobytes().decode("ascii")
+        if key < 0:
+            key += self.n
+        if not 0 <= key < self.n:
+            raise IndexError("PackedSequence index out of range")
+        return chr(self.CodesAt(np.array([key]))[0])
+
+    def __iter__(self):
+        chunk_size = 1 << 16
+        for start in range(0, self.n, chunk_size):
+            yield from self.Codes(start, start + chunk_size).tobytes().decode("ascii")
+
+    def __add__(self, other: "str | PackedSequence") -> "PackedSequence":
+        return PackedSequence(np.concatenate([self.Codes(), AsciiCodes(other)]))
+
+    def __str__(self) -> str:
+        return self.Codes().tobytes().decode("ascii")
+
+    def Codes(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        Unpacks part of the sequence.
+        Input:
+            start: The first position to unpack.
+            stop: One past the last position to unpack (defaults to the end).
+        Output:
+            The ascii codes of the characters as a numpy uint8 array.
+        """
+        stop = self.n if stop is None else min(stop, self.n)
+        if start >= stop:
+            return np.zeros(0, dtype=np.uint8)
+        return self.CodesAt(np.arange(start, stop))
+
+    def CodesAt(self, i: np.ndarray) -> np.ndarray:
+        """
+        Vectorised lookup of the characters at many positions.
+        Input:
+            i: The positions.
+        Output:
+            The ascii codes of the characters.
+        """
+        i = np.asarray(i, dtype=np.int64)
+        codes = (self.packed[i // BASES_PER_WORD] >> (2 * (i % BASES_PER_WORD)).astype(np.uint64)) & np.uint64(3)
+        chars = DNA_LETTERS[codes.astype(np.int64)]
+        if len(self.escape_positions) > 0:
+            idx = np.minimum(np.searchsorted(self.escape_positions, i), len(self.escape_positions) - 1)
+            is_escape = self.escape_positions[idx] == i
+            chars[is_escape] = self.escape_chars[idx[is_escape]]
+        return chars
+
+    def Count(self, letter: str, i: int) -> int:
+        """
+        Returns the number of times a letter appears before position i, using popcounts over the packed words.
+        Input:
+            letter: The letter being counted.
+            i: The position to count until.
+        """
+        if letter not in DNA_CODES:
+            return int(np.count_nonzero(self.escape_chars[: np.searchsorted(self.escape_positions, i)] == ord(letter)))
+        last_word, remainder = divmod(i, BASES_PER_WORD)
+        matches = MatchingWords(self.packed[: last_word + (remainder > 0)], DNA_CODES[letter])
+        if remainder:
+            matches[-1] &= np.uint64((1 << (2 * remainder)) - 1)
+        count = int(np.bitwise_count(matches).sum())
+        if letter == "A":  # Escapes are packed as "A".
+            count -= int(np.searchsorted(self.escape_positions, i))
+        return count
+
+    def LetterCounts(self) -> dict[str, int]:
+        """
+        Counts how many times every character appears in the sequence.
+        """
+        counts = {}
+        for letter in DNA_CODES:
+            count = self.Count(letter, self.n)
+            if count > 0:
+                counts[letter] = count
+        for code, count in zip(*np.unique(self.escape_chars, return_counts=True)):
+            counts[chr(code)] = int(count)
+        return counts
+
+    def Mismatches(self, pattern: str, starts: np.ndarray) -> np.ndarray:
+        """
+        Vectorised Hamming distance between a pattern and the sequence at many starting positions.
+        Input:
+            pattern: The pattern being compared.
+            starts: The starting positions. Every window must fit inside the sequence.
+        Output:
+            The number of mismatches at each starting position.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        windows = self.CodesAt(starts[:, None] + np.arange(len(pattern)))
+        return np.count_nonzero(windows != AsciiCodes(pattern), axis=1)
+
+    def NumBytes(self) -> int:
+        """
+        Returns the memory used by the packed words and the escape list.
+        """
+        return self.packed.nbytes + self.escape_positions.nbytes + self.escape_chars.nbytes
+
+
+def LoadPackedSequence(
+    n: int, packed: np.ndarray, escape_positions: np.ndarray, escape_chars: np.ndarray
+) -> PackedSequence:
+    """
+    Creates a PackedSequence from its arrays (see the properties of PackedSequence), e.g. views into a memory mapped
+    file, without packing the sequence again.
+    """
+    sequence = PackedSequence.__new__(PackedSequence)
+    sequence.n = n
+    sequence.packed = packed
+    sequence.escape_positions = escape_positions
+    sequence.escape_chars = escape_chars
+    return sequence
+
+
+def AsciiCodes(word: "str | PackedSequence | np.ndarray") -> np.ndarray:
+    """
+    Returns the ascii codes of a word as a numpy uint8 array.
+    Input:
+        word: An ascii string, a PackedSequence, or an array of ascii codes (returned as is).
+    """
+    if isinstance(word, PackedSequence):
+        return word.Codes()
+    if isinstance(word, np.ndarray):
+        return word.astype(np.uint8, copy=False)
+    return np.frombuffer(word.encode("ascii"), dtype=np.uint8)
+
+
+def MatchingBases(word: int, code: int) -> int:
+    """
+    Marks the 2 bit fields of a packed word that hold a given base.
+    Input:
+        word: 32 bases packed at 2 bits per base.
+        code: The 2 bit code of the base.
+    Output:
+        An integer with the low bit of every matching field set.
+    """
+    diff = word ^ (code * LOW_BITS)
+    return ~(diff | (diff >> 1)) & LOW_BITS & FULL_WORD
+
+
+def MatchingWords(words: np.ndarray, codes: "int | np.ndarray") -> np.ndarray:
+    """
+    Vectorised MatchingBases over an array of packed words.
+    Input:
+        words: The packed words.
+        codes: The 2 bit code of the base, either one for all words or one per word.
+    """
+    diff = words ^ (np.asarray(codes, dtype=np.uint64) * np.uint64(LOW_BITS))
+    return ~(diff | (diff >> np.uint64(1))) & np.uint64(LOW_BITS)
+
+
+def PackDNA(chars: np.ndarray) -> np.ndarray:
+    """
+    Packs DNA characters at 2 bits per base (A=0, C=1, G=2, T=3). Base j of word w is stored in bits 2j and 2j+1 of
+    element w. Characters other than A, C, G, T are packed as A. The characters are packed PACK_BLOCK_WORDS words at
+    a time, so the 64 bit temporaries stay small however long the sequence is.
+    Input:
+        chars: The ascii codes of the characters.
+    Output:
+        The packed word as a numpy uint64 array.
+    """
+    lookup = np.zeros(256, dtype=np.uint64)
+    for letter, code in DNA_CODES.items():
+        lookup[ord(letter)] = code
+    num_words = -(-len(chars) // BASES_PER_WORD)
+    packed = np.zeros(num_words, dtype=np.uint64)
+    shifts = np.arange(0, 2 * BASES_PER_WORD, 2, dtype=np.uint64)
+    for first_word in range(0, num_words, PACK_BLOCK_WORDS):
+        block = chars[first_word * BASES_PER_WORD : (first_word + PACK_BLOCK_WORDS) * BASES_PER_WORD]
+        block_words = -(-len(block) // BASES_PER_WORD)
+        codes = np.zeros(block_words * BASES_PER_WORD, dtype=np.uint64)
+        codes[: len(block)] = lookup[block]
+        packed[first_word : first_word + block_words] = np.bitwise_or.reduce(
+            codes.reshape(block_words, BASES_PER_WORD) << shifts, axis=1
+        )
+    return packed
@@ -0,0 +1,124 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+from FMIndex import *
+from SequenceReader import *
+
+worker_index = None  # The FMIndex each worker process maps once, in InitializeWorker.
+
+
+def main():
+    dirname = os.path.dirname(__file__)
+    filepath = os.path.join(dirname, "inputs", "SuffixArrayMatch", "dataset_876295_4.txt")
+    word, patterns = ReadData(filepath)
+    index_path = os.path.join(dirname, "index.fmi")
+    BuildFMIndexFile(word, index_path)
+
+    answerpath = os.path.join(dirname, "answer.txt")
+    with open(answerpath, "w") as f:
+        for pattern, locations in ParallelMatch(index_path, patterns):
+            f.write(f"{pattern}:")
+            for val in locations:
+                f.write(f" {val}")
+            f.write("\n")
+
+
+def ParallelMatch(
+    index_path: str,
+    patterns: Iterable[str],
+    num_mismatches: int = 0,
+    num_workers: int = None,
+    chunk_size: int = 1000,
+):
+    """
+    Matches patterns against an FM-index file using a pool of worker processes. Every worker memory maps the same
+    index file, so the index is never pickled and its pages are shared. Patterns are sent to the workers in chunks,
+    and at most two chunks per worker are in flight at a time, so the patterns can be a stream.
+    Input:
+        index_path: An FM-index file written by BuildFMIndexFile.
+        patterns: The patterns being matched.
+        num_mismatches: The number of mismatches allowed (0 for exact matching).
+        num_workers: The number of worker processes (defaults to the number of cores).
+        chunk_size: The number of patterns sent to a worker at a time.
+    Output:
+        Yields (pattern, sorted starting positions) pairs in the same order as patterns.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count()
+    chunks = ReadBatches(patterns, chunk_size)
+    in_flight = deque()
+    with ProcessPoolExecutor(num_workers, initializer=InitializeWorker, initargs=(index_path,)) as executor:
+        while True:
+            while len(in_flight) < 2 * num_workers:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                in_flight.append((chunk, executor.submit(MatchChunk, chunk, num_mismatches)))
+            if len(in_flight) == 0:
+                break
+            chunk, future = in_flight.popleft()
+            yield from zip(chunk, future.result())
+
+
+def MatchReadFile(
+    index_path: str,
+    reads_path: str,
+    output_path: str,
+    num_mismatches: int = 0,
+    num_workers: int = None,
+    chunk_size: int = 1000,
+):
+    """
+    Matches every read of a FASTA/FASTQ file (optionally gzip compressed) against an FM-index file. Reads are streamed
+    from disk, matched in chunks by ParallelMatch and written out as they come back, so memory does not grow with the
+    number of reads.
+    Input:
+        index_path: An FM-index file written by BuildFMIndexFile.
+        reads_path: The FASTA or FASTQ file of reads.
+        output_path: Where to write one "name: positions" line per read.
+        num_mismatches: The number of mismatches allowed (0 for exact matching).
+        num_workers: The number of worker processes (defaults to the number of cores).
+        chunk_size: The number of reads sent to a worker at a time.
+    """
+    names = deque()
+
+    def Sequences():
+        for name, sequence in ReadSequences(reads_path):
+            names.append(name)
+            yield sequence
+
+    with open(output_path, "w") as f:
+        for _, locations in ParallelMatch(index_path, Sequences(), num_mismatches, num_workers, chunk_size):
+            f.write(f"{names.popleft()}:")
+            for val in locations:
+                f.write(f" {val}")
+            f.write("\n")
+
+
+def InitializeWorker(index_path: str):
+    """
+    Maps the FM-index file once in a worker process.
+    Input:
+        index_path: The FM-index file.
+    """
+    global worker_index
+    worker_index = FMIndex(index_path)
+
+
+def MatchChunk(patterns: list[str], num_mismatches: int) -> list[list[int]]:
+    """
+    Matches a chunk of patterns against the worker's FM-index.
+    Input:
+        patterns: The patterns being matched.
+        num_mismatches: The number of mismatches allowed.
+    Output:
+        The sorted starting positions of each pattern.
+    """
+    if num_mismatches == 0:
+        return [sorted(worker_index.Match(pattern)) for pattern in patterns]
+    return [worker_index.ApproximateMatch(pattern, num_mismatches) for pattern in patterns]
+
+
+if __name__ == "__main__":
+    main()
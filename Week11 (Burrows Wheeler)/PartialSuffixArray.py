@@ -1,4 +1,9 @@
-import os
+import os, sys
+import numpy as np
+# SuffixArrayConstruction is shared with Week10 rather than copied.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Week10 (Suffix Trees)"))
+from SuffixArrayConstruction import BuildSuffixArray
+from PackedDNA import PackedSequence, AsciiCodes
 
 def main():
     dirname = os.path.dirname(__file__)
@@ -17,23 +22,75 @@ def ReadData(filepath):
         k = int(f.readline().strip())    
     return word, k
 
-def PartialSuffixArray(s: str, k: int) -> dict[int, int]:
+def PartialSuffixArray(s: "str | PackedSequence", k: int, suffix_arr: np.ndarray = None) -> dict[int, int]:
     """
     Generates a partial suffix array. Keeps every k'th element of the suffix array.
     Input:
         s: The word to create a partial suffix array of.
         k: The increment size for which elements of the suffix array to keep.
+        suffix_arr: (Optional) The full suffix array of s, if it has already been built.
     Output:
         The partial suffix array as a list of integers.
     """
-    suffixes = [(i,s[i:]) for i in range(len(s))]
-    suffixes = sorted(suffixes, key=lambda x: x[1])
-    indexes = [x[0] for x in suffixes]
-    suffix_dict = {}
-    for i, j in enumerate(indexes):
-        if j%k == 0:
-            suffix_dict[i] = j
+    samples = SamplePartialSuffixArray(s, k, suffix_arr)
+    suffix_dict = dict(zip(samples.rows.tolist(), samples.positions.tolist()))
     return suffix_dict
 
+def SamplePartialSuffixArray(s: "str | PackedSequence", k: int, suffix_arr: np.ndarray = None) -> "SampledSuffixArray":
+    """
+    Generates a partial suffix array stored as two arrays instead of a dictionary.
+    Input:
+        s: The word to create a partial suffix array of.
+        k: The increment size for which elements of the suffix array to keep.
+        suffix_arr: (Optional) The full suffix array of s, if it has already been built.
+    """
+    if suffix_arr is None:
+        suffix_arr = BuildSuffixArray(AsciiCodes(s) if isinstance(s, PackedSequence) else s)
+    rows = np.flatnonzero(suffix_arr % k == 0)
+    return SampledSuffixArray(rows, suffix_arr[rows].astype(np.int64))
+
+
+class SampledSuffixArray:
+    """
+    Read-only dictionary-like view of a partial suffix array stored as two sorted arrays. Supports the same
+    "row in partial_suffix" and "partial_suffix[row]" lookups as the dictionary returned by PartialSuffixArray.
+
+    Properties:
+        rows: The sorted suffix array rows that were sampled.
+
+        positions: The suffix array value (starting position in the word) of each sampled row.
+    """
+    def __init__(self, rows: np.ndarray, positions: np.ndarray):
+        self.rows = rows
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, row: int) -> bool:
+        idx = np.searchsorted(self.rows, row)
+        return idx < len(self.rows) and self.rows[idx] == row
+
+    def __getitem__(self, row: int) -> int:
+        idx = np.searchsorted(self.rows, row)
+        if idx == len(self.rows) or self.rows[idx] != row:
+            raise KeyError(row)
+        return int(self.positions[idx])
+
+    def Lookup(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorised lookup of many rows at once.
+        Input:
+            rows: The suffix array rows being looked up.
+        Output:
+            A boolean array marking the rows that were sampled, and the position of each row (only meaningful where
+            the row was sampled).
+        """
+        if len(self.rows) == 0:
+            return np.zeros(len(rows), dtype=bool), np.zeros(len(rows), dtype=np.int64)
+        idx = np.minimum(np.searchsorted(self.rows, rows), len(self.rows) - 1)
+        return self.rows[idx] == rows, self.positions[idx].astype(np.int64)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,106 @@
+import gzip, io
+from itertools import islice
+from typing import Iterable, Iterator
+
+GZIP_MAGIC = b"\x1f\x8b"
+READ_BUFFER_SIZE = 1 << 20
+
+
+def OpenSequenceFile(filepath: str) -> io.TextIOBase:
+    """
+    Opens a (possibly gzip compressed) sequence file for reading as text with a large read buffer.
+    Input:
+        filepath: The path to the file. Gzip files are recognised by their first two bytes, not their name.
+    """
+    with open(filepath, "rb") as f:
+        is_gzip = f.read(2) == GZIP_MAGIC
+    if is_gzip:
+        return io.TextIOWrapper(io.BufferedReader(gzip.open(filepath, "rb"), READ_BUFFER_SIZE))
+    return open(filepath, buffering=READ_BUFFER_SIZE)
+
+
+def ReadSequences(filepath: str) -> Iterator[tuple[str, str]]:
+    """
+    Streams the records of a FASTA or FASTQ file one at a time. The format is taken from the first character of the
+    file (">" for FASTA, "@" for FASTQ). FASTQ records are expected to be four lines long.
+    Input:
+        filepath: The path to the (possibly gzip compressed) file.
+    Output:
+        Yields (name, sequence) pairs. The name is the header line without its ">" or "@".
+    """
+    with OpenSequenceFile(filepath) as f:
+        first_line = f.readline()
+        if first_line.startswith(">"):
+            yield from ParseFasta(first_line, f)
+        elif first_line.startswith("@"):
+            yield from ParseFastq(first_line, f)
+        elif first_line.strip() != "":
+            raise ValueError(f"{filepath} is not a FASTA or FASTQ file.")
+
+
+def ParseFasta(header: str, lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """
+    Parses FASTA records, whose sequences may be split over many lines.
+    Input:
+        header: The first header line.
+        lines: The rest of the lines of the file.
+    """
+    name = header[1:].strip()
+    sequence_lines = []
+    for line in lines:
+        if line.startswith(">"):
+            yield name, "".join(sequence_lines)
+            name = line[1:].strip()
+            sequence_lines = []
+        else:
+            sequence_lines.append(line.strip())
+    yield name, "".join(sequence_lines)
+
+
+def ParseFastq(header: str, lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """
+    Parses four line FASTQ records (header, sequence, "+", qualities). The qualities are skipped.
+    Input:
+        header: The first header line.
+        lines: The rest of the lines of the file.
+    """
+    lines = iter(lines)
+    while header:
+        if not header.startswith("@"):
+            raise ValueError(f"Expected a FASTQ header, got: {header.strip()}")
+        sequence = next(lines, "").strip()
+        next(lines, None)  # "+" line
+        next(lines, None)  # quality line
+        yield header[1:].strip(), sequence
+        header = next(lines, "")
+        while header != "" and header.strip() == "":
+            header = next(lines, "")
+
+
+def ReadBatches(records: Iterable, batch_size: int) -> Iterator[list]:
+    """
+    Groups a stream into lists of at most batch_size items, so that only one batch is in memory at a time.
+    Input:
+        records: The stream, e.g. from ReadSequences.
+        batch_size: The largest number of items in a batch.
+    """
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+def ReadReference(filepath: str) -> str:
+    """
+    Reads a reference word. FASTA (or FASTQ) files have the sequences of all their records joined together. Any other
+    file is read in the plain format used by the Week11 inputs, where the word is the first line.
+    Input:
+        filepath: The path to the (possibly gzip compressed) file.
+    """
+    with OpenSequenceFile(filepath) as f:
+        first_line = f.readline()
+    if first_line.startswith(">") or first_line.startswith("@"):
+        return "".join(sequence for _, sequence in ReadSequences(filepath))
+    return first_line.strip()
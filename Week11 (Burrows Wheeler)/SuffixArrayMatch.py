@@ -1,7 +1,9 @@
 import os
+from collections import OrderedDict
 from PartialSuffixArray import *
 from BurrowsWheeler import *
 from BWTDecode import *
+from OccTable import OccTable
 
 
 def main():
@@ -25,49 +27,53 @@ def ReadData(filepath):
     return word, patterns
 
 
-def SuffixArrayMatch(word: str, patterns: list[str]) -> dict[str, list[int]]:
+def SuffixArrayMatch(
+    word: "str | PackedSequence", patterns: list[str], k: int = 5, checkpoint_step: int = 128, cache_size: int = 0
+) -> dict[str, list[int]]:
     """
     Performs suffix array pattern matching.
     Input:
-        word: The word we are trying to match
+        word: The word we are trying to match (a string or a PackedSequence).
         patterns: the patterns we are trying to match.
+        k: The increment size of the partial suffix array. Larger values use less memory but each located match
+            takes more LF steps (see LocateCost and FMIndex.Report).
+        checkpoint_step: The distance between checkpoints of the Occ table (a multiple of 32).
+        cache_size: The number of located rows to remember between patterns (0 for no cache). Helps when the
+            same repeats are located over and over.
     Output:
         A dictionary that holds the starting locations of each pattern.
     """
-    k = 5
     word = word + "$"
-    bw_word = bwt(word)
+    suffix_arr = BuildSuffixArray(AsciiCodes(word))
+    bw_word = bwt(word, suffix_arr)
     ranks = GetRanks(bw_word)
-    partial_suffix = PartialSuffixArray(word, k)
-    partial_count = PartialCountMatrix(word, k)
+    partial_suffix = SamplePartialSuffixArray(word, k, suffix_arr)
+    occ = OccTable(bw_word, checkpoint_step)
+    cache = LocateCache(cache_size) if cache_size > 0 else None
     match_locations = {}
     for pattern in patterns:
-        match_locations[pattern] = PartialSuffixArrayMatch(pattern, bw_word, ranks, partial_suffix, partial_count, k)
+        match_locations[pattern] = PartialSuffixArrayMatch(pattern, bw_word, ranks, partial_suffix, occ, cache)
     return match_locations
 
 
-def PartialCountMatrix(word: str, k: int) -> dict[str, list[int]]:
+def PartialCountMatrix(
+    word: "str | PackedSequence", k: int, suffix_arr: np.ndarray = None
+) -> dict[str, list[int]]:
     """
     Creates and returns a partical count dictionary for a bwt word.
     Input:
         bwt_word: A Burrows-Wheeler transformed word.
         k: The increment used to create the partical count matrix.
+        suffix_arr: (Optional) The suffix array of word, used to build the Burrows-Wheeler transform.
     Output:
         The partical count matrix as a dictionary.
     """
-    bw_word = bwt(word)
-    alphabet = set(bw_word)
-    counter_dict = {}
+    bw_word = AsciiCodes(bwt(word, suffix_arr))
     count_matrix_dict = {}
-    for letter in alphabet:
-        counter_dict[letter] = 0
-        count_matrix_dict[letter] = []
-
-    for i, letter in enumerate(bw_word):
-        if i % 5 == 0:
-            for key in counter_dict:
-                count_matrix_dict[key].append(counter_dict[key])
-        counter_dict[letter] += 1
+    for code in np.unique(bw_word):
+        counts = np.zeros(len(bw_word) + 1, dtype=np.int64)
+        np.cumsum(bw_word == code, out=counts[1:])
+        count_matrix_dict[chr(code)] = counts[: len(bw_word) : k].tolist()
 
     return count_matrix_dict
 
@@ -76,9 +82,9 @@ def PartialSuffixArrayMatch(
     pattern: str,
     bw_word: str,
     ranks: dict[str, int],
-    partial_suffix: dict[int, int],
-    partial_count: dict[str, list[int]],
-    k: int,
+    partial_suffix: SampledSuffixArray,
+    occ: OccTable,
+    cache: "LocateCache" = None,
 ):
     """
     Finds the locations in a word that matches a given pattern.
@@ -88,96 +94,104 @@ def PartialSuffixArrayMatch(
         ranks: A dictionary that holds the "rank" of each character that appears in the word. The rank
             of a character is the number of "smaller" characters that appear in the word.
         partial_suffx: The partial suffix array of the word.
-        partial_count: The partial count matrix of the word.
-        k: The "increment size" of the partial suffix array and partial count matrix.
+        occ: The rank (Occ) table of the Burrows-Wheeler transformed word.
+        cache: (Optional) A cache of rows that have already been located.
     """
-    alphabet = sorted(ranks.keys())
-    alphabet_ind = alphabet.index(pattern[-1])
-    top_idx = ranks[alphabet[alphabet_ind]]
-    if alphabet_ind != len(alphabet) - 1:
-        bot_idx = ranks[alphabet[alphabet_ind + 1]]
-    else:
-        bot_idx = len(bw_word)
-
-    locations = []
-    # print(f"Word: {bw_word}\nRanks {ranks}\tPattern: {pattern}")
-    for i, letter in enumerate(reversed(pattern[:-1])):
-        # print(f"Top Index: {top_idx}\tBot Index: {bot_idx}\tLetter: {letter}")
-        found_first = False
-        for j in range(top_idx, bot_idx):
-            if bw_word[j] == letter:
-                if i == len(pattern) - 2:
-                    locations.append(
-                        ranks[letter] + GetCountFromPartialCountMatrix(bw_word, partial_count, letter, j, k)
-                    )
-                elif not found_first:
-                    top_idx = ranks[letter] + GetCountFromPartialCountMatrix(bw_word, partial_count, letter, j, k)
-                    bot_idx = top_idx + 1
-                    found_first = True
-                else:
-                    bot_idx += 1
-        if not found_first:
-            break
-    # print(f"locations: {locations}")
-
-    suffix_indexes = []
-    for i in locations:
-        suffix_indexes.append(GetStartingPosition(bw_word, ranks, partial_suffix, partial_count, i, k))
-    # print(suffix)
-    return suffix_indexes
-
-
-def GetStartingPosition(
-    bw_word: str,
+    top_idx, bot_idx = 0, len(bw_word)
+    for letter in reversed(pattern):
+        top_idx, bot_idx = occ.TopBot(letter, top_idx, bot_idx, ranks)
+        if top_idx >= bot_idx:
+            return []
+
+    rows = np.arange(top_idx, bot_idx, dtype=np.int64)
+    return BatchLocate(rows, ranks, partial_suffix, occ, cache).tolist()
+
+
+def BatchLocate(
+    rows: np.ndarray,
     ranks: dict[str, int],
-    partial_suffix: dict[int, int],
-    partial_count: dict[str, list[int]],
-    i: int,
-    k: int,
-) -> int:
+    partial_suffix: SampledSuffixArray,
+    occ: OccTable,
+    cache: "LocateCache" = None,
+) -> np.ndarray:
     """
-    Gets the suffix number of a given position using a partial suffix array and a Burrows-Wheeler transformed word.
+    Gets the suffix numbers of many rows at once. Every row that has not reached a sampled suffix yet takes one LF
+    step per round, and all of those steps are done together with numpy.
     Input:
-        bw_word: A Burrows-Wheeler transformed word.
-        ranks: A dictionary that holds the "rank" of each character that appears in the word. The rank
-            of a character is the number of "smaller" characters that appear in the word.
+        rows: The rows of the Burrows-Wheeler matrix being located.
+        ranks: A dictionary that holds the "rank" of each character that appears in the word.
         partial_suffix: The partial suffix array.
-        partial_count: The partial count matrix
-        i: The index we are trying to find the suffix value of.
-        k: The increment size of the partial suffix array and partial count.
+        occ: The rank (Occ) table of the Burrows-Wheeler transformed word.
+        cache: (Optional) A cache of rows that have already been located. Newly located rows are added to it.
     Output:
-        The suffix array index as an integer
+        The suffix array value of each row.
     """
+    positions = np.full(len(rows), -1, dtype=np.int64)
+    if cache is not None:
+        for j, row in enumerate(rows.tolist()):
+            positions[j] = cache.Get(row, -1)
+
+    rank_lookup = RankLookup(ranks)
+    unresolved = np.flatnonzero(positions < 0)
+    current = rows[unresolved]
     num_steps = 0
-    current_idx = i
-    while True:
-        if current_idx in partial_suffix:  # Stop condition.
-            break
-        pass
-        letter = bw_word[current_idx]
-        current_idx = ranks[letter] + GetCountFromPartialCountMatrix(bw_word, partial_count, letter, current_idx, k)
+    while len(unresolved) > 0:
+        sampled, sample_positions = partial_suffix.Lookup(current)
+        positions[unresolved[sampled]] = sample_positions[sampled] + num_steps
+        unresolved, current = unresolved[~sampled], current[~sampled]
+        letters = occ.CharsAt(current)
+        current = rank_lookup[letters] + occ.CountMany(letters, current)
         num_steps += 1
-    return partial_suffix[current_idx] + num_steps
 
+    if cache is not None:
+        for row, position in zip(rows.tolist(), positions.tolist()):
+            cache.Put(row, position)
+    return positions
+
+
+class LocateCache:
+    """
+    A bounded least-recently-used cache of located rows (row -> starting position).
 
-def GetCountFromPartialCountMatrix(bw_word: str, partial_count: dict[str, list[int]], letter: str, i: int, k: int):
+    Properties:
+        max_size: The most rows the cache holds. The least recently used row is dropped when it is full.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.positions = OrderedDict()
+
+    def Get(self, row: int, default: int = None) -> int:
+        """
+        Returns the cached position of a row, or default if the row is not cached.
+        """
+        if row not in self.positions:
+            return default
+        self.positions.move_to_end(row)
+        return self.positions[row]
+
+    def Put(self, row: int, position: int):
+        """
+        Caches the position of a row.
+        """
+        self.positions[row] = position
+        self.positions.move_to_end(row)
+        if len(self.positions) > self.max_size:
+            self.positions.popitem(last=False)
+
+
+def LocateCost(k: int, checkpoint_step: int) -> dict[str, float]:
     """
-    Determines the count of a character using a partial count matrix. Count being the number of times a specific
-    letter appears in a word before and at a given index.
+    Estimates the cost of locating one match. Every k'th text position is sampled, so reaching a sample takes
+    between 0 and k - 1 LF steps, and every LF step counts on average half a checkpoint interval.
     Input:
-        bw_word: the word we are using to count
-        partial_count: The partial count matrix
-        letter: The letter we are counting
-        i: The index to count until
-        k: the increment size of the partial count matrix
-    Output:
-        The number of times a letter appears in a word from the beginning of the word to the given index.
+        k: The increment size of the partial suffix array.
+        checkpoint_step: The distance between checkpoints of the Occ table.
     """
-    count = partial_count[letter][i // k]
-    for x in range(i // k * k, i):
-        if bw_word[x] == letter:
-            count += 1
-    return count
+    return {
+        "expected_lf_steps": (k - 1) / 2,
+        "worst_lf_steps": k - 1,
+        "expected_bases_scanned_per_step": checkpoint_step / 2,
+    }
 
 
 if __name__ == "__main__":
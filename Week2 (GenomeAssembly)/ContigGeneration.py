@@ -1,6 +1,9 @@
 import os
 from glob import glob
 from DeBruijnKmers import *
+from DeBruijnGraph import *
+from KmerCounting import *
+from UnitigGraph import *
 from Eulerian import *
 from NonBranchingPath import *
 from GenomePath import *
@@ -29,6 +32,9 @@ def ContigGeneration(Patterns: list[str]) -> list[str]:
     Output:
         contigs : The list of contigs.
     """
+    if IsDNAKmers(Patterns): # Build the graph on integer codes and compact it into unitigs.
+        return UnitigGraph(BuildDeBruijnGraph(Patterns)).Unitigs()
+
     G = DeBruijnKmers(Patterns)
     contig_paths = MaximalNonBranchingPaths(G)
     contigs = []
@@ -38,5 +44,22 @@ def ContigGeneration(Patterns: list[str]) -> list[str]:
 
     return contigs
 
+def ContigGenerationFromReads(filepaths: list[str], k: int, min_count: int = 2, sketch_width: int = 0) -> list[str]:
+    """
+    ContigGenerationFromReads finds the contigs of a set of sequencing reads. The k-mers of the reads are counted
+    while the files are streamed, and the ones seen fewer than min_count times (mostly sequencing errors) are dropped
+    before the de Bruijn graph is built. Each contig is found once per strand.
+
+    Input:
+        filepaths : The FASTA/FASTQ files of the reads.
+        k : The length of the k-mers (at most 32).
+        min_count : The fewest times a k-mer has to be seen to be kept.
+        sketch_width : (Optional) The width of the count-min sketch used to filter the k-mers (see CountKmers).
+
+    Output:
+        contigs : The list of contigs.
+    """
+    return UnitigGraph(SolidKmerGraph(filepaths, k, min_count, sketch_width)).Unitigs()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,205 @@
+import os
+from glob import glob
+import numpy as np
+from DeBruijnKmers import *
+
+DNA_CODES = np.full(256, -1, dtype=np.int8) # 2 bit code of each ascii character (-1 if it is not a base).
+DNA_CODES[np.frombuffer(b"ACGT", dtype=np.uint8)] = np.arange(4)
+DNA_LETTERS = np.frombuffer(b"ACGT", dtype=np.uint8)
+MAX_K = 32 # 2 bits per base in a 64 bit code.
+
+
+def main():
+    dirpath = os.path.join(os.path.dirname(__file__), "Files", "Inputs", "DeBruijn")
+    filepaths = sorted(glob(os.path.join(dirpath, "*.txt")))
+    k_mers = ReadTests_DeBruijnKmers(filepaths[0])
+    G = BuildDeBruijnGraph(k_mers)
+
+    answer_path = os.path.join(os.path.dirname(__file__), "DeBruijnGraph.txt")
+    with open(answer_path, 'w') as f:
+        labels = G.Labels(np.arange(len(G)))
+        for node, targets in G.items():
+            if targets:
+                f.write(labels[node] + ": " + " ".join(labels[x] for x in targets) + "\n")
+
+
+class DeBruijnGraph:
+    """
+    The de Bruijn graph of a collection of DNA k-mers in compressed sparse row (CSR) form. Each k-mer is a 64 bit
+    integer (2 bits per base), and the codes of its prefix and suffix (k-1)-mers are a shift and a mask of it. The
+    nodes are the distinct (k-1)-mers numbered in sorted order, and the edges out of node v are
+    targets[offsets[v]:offsets[v + 1]], in the order the k-mers were given. No string is made per k-mer or per node.
+
+    The graph can be used like the adjacency dictionary returned by DeBruijnKmers, with node numbers in place of
+    (k-1)-mers: len(G), iterating over the nodes, G[v] (the list of targets of v), G.get and G.items. Every node has a
+    key, including the ones with no edges out.
+
+    Properties:
+        k: The length of the k-mers.
+
+        nodes: The codes of the (k-1)-mers of the nodes, sorted (uint64).
+
+        offsets: The edges out of node v are edges offsets[v] to offsets[v + 1] - 1 (int64, len(nodes) + 1 long).
+
+        targets: The node each edge goes to.
+
+        in_degree, out_degree: The in and out degree of each node (int32 arrays).
+    """
+    def __init__(self, kmer_codes: np.ndarray, k: int):
+        if not 1 <= k <= MAX_K:
+            raise ValueError(f"k must be between 1 and {MAX_K} to encode k-mers in 64 bits.")
+        kmer_codes = np.asarray(kmer_codes, dtype=np.uint64)
+        self.k = k
+        num_edges = len(kmer_codes)
+        prefixes = kmer_codes >> np.uint64(2)
+        suffixes = kmer_codes & np.uint64((1 << 2 * (k - 1)) - 1)
+        self.nodes, node_ids = np.unique(np.concatenate([prefixes, suffixes]), return_inverse=True)
+        node_ids = node_ids.reshape(-1)
+        sources, targets = node_ids[:num_edges], node_ids[num_edges:]
+
+        index_dtype = np.int32 if len(self.nodes) < 2**31 else np.int64
+        order = np.argsort(sources, kind="stable")
+        self.targets = targets[order].astype(index_dtype)
+        self.out_degree = np.bincount(sources, minlength=len(self.nodes)).astype(np.int32)
+        self.in_degree = np.bincount(targets, minlength=len(self.nodes)).astype(np.int32)
+        self.offsets = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(self.out_degree, out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(range(len(self.nodes)))
+
+    def __contains__(self, node: int) -> bool:
+        return isinstance(node, (int, np.integer)) and 0 <= node < len(self.nodes)
+
+    def __getitem__(self, node: int) -> list[int]:
+        if node not in self:
+            raise KeyError(node)
+        return self.targets[self.offsets[node] : self.offsets[node + 1]].tolist()
+
+    def get(self, node: int, default=None) -> list[int]:
+        return self[node] if node in self else default
+
+    def items(self):
+        targets = self.targets.tolist()
+        offsets = self.offsets.tolist()
+        for node in range(len(self.nodes)):
+            yield node, targets[offsets[node] : offsets[node + 1]]
+
+    def NumEdges(self) -> int:
+        return len(self.targets)
+
+    def Labels(self, nodes: "list[int] | np.ndarray") -> list[str]:
+        """
+        Labels converts node numbers back to their (k-1)-mers.
+
+        Input:
+            nodes : The node numbers.
+
+        Output:
+            labels : The (k-1)-mers of the nodes.
+        """
+        return DecodeKmers(self.nodes[np.asarray(nodes, dtype=np.int64)], self.k - 1)
+
+    def Spell(self, path: "list[int] | np.ndarray") -> str:
+        """
+        Spell spells the string of a path of nodes, like GenomePath does for a path of (k-1)-mers. The first node
+        gives k-1 letters and every other node adds its last letter, which is its lowest 2 bits.
+
+        Input:
+            path : The path, as a list of node numbers.
+
+        Output:
+            Text : The string spelled by the path.
+        """
+        path = np.asarray(path, dtype=np.int64)
+        if len(path) == 0:
+            return ""
+        last_letters = DNA_LETTERS[(self.nodes[path[1:]] & np.uint64(3)).astype(np.intp)]
+        return self.Labels(path[:1])[0] + last_letters.tobytes().decode("ascii")
+
+    def NumBytes(self) -> int:
+        """
+        NumBytes returns the memory used by the graph arrays.
+        """
+        arrays = [self.nodes, self.offsets, self.targets, self.in_degree, self.out_degree]
+        return sum(arr.nbytes for arr in arrays)
+
+
+def BuildDeBruijnGraph(k_mers: list[str]) -> DeBruijnGraph:
+    """
+    BuildDeBruijnGraph creates the de Bruijn graph of a list of DNA k-mers in CSR form. It is the same graph as
+    DeBruijnKmers(k_mers), with the (k-1)-mers replaced by node numbers.
+
+    Input:
+        k_mers : A list of k-mers over A, C, G, T, all of the same length (at most 32).
+
+    Output:
+        G : The DeBruijnGraph of k_mers.
+    """
+    k = len(k_mers[0]) if k_mers else 1
+    return DeBruijnGraph(EncodeKmers(k_mers), k)
+
+
+def IsDNAKmers(k_mers: list[str]) -> bool:
+    """
+    IsDNAKmers checks if a list of k-mers can be encoded by EncodeKmers: it is not empty, every k-mer is made of A,
+    C, G and T, and they all have the same length, at most MAX_K.
+    """
+    if not k_mers:
+        return False
+    k = len(k_mers[0])
+    return 1 <= k <= MAX_K and all(len(k_mer) == k for k_mer in k_mers) and set("".join(k_mers)) <= set("ACGT")
+
+
+def EncodeKmers(k_mers: list[str]) -> np.ndarray:
+    """
+    EncodeKmers packs k-mers into 64 bit integers, 2 bits per base (A = 0, C = 1, G = 2, T = 3) with the first base
+    in the highest bits, so the codes sort in the same order as the k-mers.
+
+    Input:
+        k_mers : A list of k-mers over A, C, G, T, all of the same length (at most 32).
+
+    Output:
+        codes : The codes of the k-mers, as a uint64 array.
+    """
+    if not k_mers:
+        return np.zeros(0, dtype=np.uint64)
+    k = len(k_mers[0])
+    if not 1 <= k <= MAX_K or any(len(k_mer) != k for k_mer in k_mers):
+        raise ValueError(f"The k-mers must all have the same length, between 1 and {MAX_K}.")
+    chars = np.frombuffer("".join(k_mers).encode("ascii", errors="replace"), dtype=np.uint8)
+    bases = DNA_CODES[chars]
+    if (bases < 0).any():
+        raise ValueError("The k-mers can only contain the letters A, C, G and T.")
+    bases = bases.reshape(-1, k).astype(np.uint64)
+    codes = np.zeros(len(k_mers), dtype=np.uint64)
+    for j in range(k):
+        codes = (codes << np.uint64(2)) | bases[:, j]
+    return codes
+
+
+def DecodeKmers(codes: np.ndarray, k: int) -> list[str]:
+    """
+    DecodeKmers turns codes made by EncodeKmers back into k-mers.
+
+    Input:
+        codes : The codes.
+        k : The length of the k-mers.
+
+    Output:
+        k_mers : The k-mers.
+    """
+    codes = np.asarray(codes, dtype=np.uint64)
+    if k == 0:
+        return [""] * len(codes)
+    shifts = np.arange(2 * (k - 1), -1, -2, dtype=np.uint64)
+    letters = DNA_LETTERS[((codes[:, None] >> shifts) & np.uint64(3)).astype(np.intp)]
+    text = letters.tobytes().decode("ascii")
+    return [text[i : i + k] for i in range(0, len(text), k)]
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 import os
 from glob import glob
+from collections import Counter
+from itertools import chain
+import numpy as np
+from DeBruijnGraph import DeBruijnGraph
 
 def main():
     dirpath = os.path.join(os.path.dirname(__file__),
@@ -37,24 +41,9 @@ def EulerianCycle(G: dict[int, list[int]]) -> list[int]:
     Output:
         path: A list of vertices corresponding to the eulerian cycle path.
     """
-    num_edges = 0
-    for key in G:
-        num_edges += len(G[key])
-    path = [list(G)[0]] # Arbitrary start vertex (since graph contains eulerian cycle).
-    while num_edges > 0:
-        last_vertex = path[len(path)-1] # last vertex visited.
-        if not G[last_vertex]: # Check if last_vertex has any unvisited neighbors.
-            # Need to choose another starting position
-            for index, vertex in enumerate(path):
-                if G[vertex]:
-                    path = path[index:-1]+path[:index]+[vertex]
-                    break
-        else:
-            # Keep traversing
-            path.append(G[last_vertex][0])
-            G[last_vertex] = G[last_vertex][1:] # Remove edge we've traversed on.
-            num_edges -= 1
-    return path
+    if not G:
+        return []
+    return HierholzerWalk(G, next(iter(G))) # Arbitrary start vertex (since graph contains eulerian cycle).
 
 def EulerianPath(G: dict[int, list[int]]) -> list[int]:
     """
@@ -67,49 +56,102 @@ def EulerianPath(G: dict[int, list[int]]) -> list[int]:
         path: The eulerian path, as a list of vertices.
     """
     in_degree, out_degree = InOutDegree(G)
-    in_out_degree = {}
-    for key in in_degree:
-        in_out_degree[key] = in_degree[key]
-    for key in out_degree:
-        if key in in_out_degree:
-            in_out_degree[key] -= out_degree[key]
-        else:
-            in_out_degree[key] = -out_degree[key]
 
-    # Finding the starting and ending vertex
+    # Finding the starting vertex (one more edge out than in).
     num_unbalanced = 0
-    for key in in_out_degree:
-        if in_out_degree[key] == -1:
-            start_vertex = key
-            num_unbalanced += 1
-        elif in_out_degree[key] == 1:
-            end_vertex = key
-            num_unbalanced += 1
+    start_vertex = None
+    if isinstance(G, DeBruijnGraph):
+        difference = out_degree.astype(np.int64) - in_degree
+        num_unbalanced = int(np.count_nonzero(difference))
+        start_vertices = np.flatnonzero(difference == 1)
+        if len(start_vertices) > 0:
+            start_vertex = int(start_vertices[0])
+    else:
+        for key in out_degree:
+            difference = out_degree[key] - in_degree[key]
+            if difference == 1:
+                start_vertex = key
+            if difference != 0:
+                num_unbalanced += 1
     if num_unbalanced > 2:
         print("Warning: Graph does not have Eulerian Path.")
-    
-    # Adding an edge so we make the graph contain eulerian cycle.
-    if num_unbalanced == 2:
-        if end_vertex in G:
-            G[end_vertex].append(start_vertex)
-        else:
-            G[end_vertex] = [start_vertex]
-
-    cycle = EulerianCycle(G)
-    if num_unbalanced == 2:
-        for index, val in enumerate(cycle[:-1]):
-            next_val = cycle[index+1]
-            if (val == end_vertex) and (next_val == start_vertex):
-                path = cycle[index+1:-1]+cycle[:index+1]
-                return path
-    else:
-        return cycle
 
-    print("Something broke if this prints.")
+    if start_vertex is None:
+        return EulerianCycle(G)
+    return HierholzerWalk(G, start_vertex)
+
+def HierholzerWalk(G: dict[int, list[int]], start: int) -> list[int]:
+    """
+    HierholzerWalk walks every edge of a graph once with Hierholzer's algorithm. Each vertex keeps a cursor into its
+    edge list instead of having its traversed edges removed, and the walk is kept on a stack. When the vertex on top
+    of the stack has no edges left it is moved to the path, so the detours are spliced in without ever copying or
+    rotating the path, and the whole walk takes O(E) time. G is not modified.
+
+    Input:
+        G: A graph containing an Eulerian cycle, or an Eulerian path that starts at start.
+        start: The vertex the walk starts from.
+
+    Output:
+        path: The walk, as a list of vertices.
+    """
+    if isinstance(G, DeBruijnGraph):
+        return HierholzerWalkCSR(G.offsets, G.targets, start)
+    cursors = {vertex: iter(edges) for vertex, edges in G.items()}
+    no_edges = iter(())
+    stack = []
+    path = []
+    vertex = start
+    while True:
+        next_vertex = next(cursors.get(vertex, no_edges), None)
+        if next_vertex is not None: # Keep traversing
+            stack.append(vertex)
+            vertex = next_vertex
+        else: # Stuck, so the vertex is finished and we backtrack to the last vertex with unused edges.
+            path.append(vertex)
+            if not stack:
+                break
+            vertex = stack.pop()
+    path.reverse()
+    return path
+
+def HierholzerWalkCSR(offsets: np.ndarray, targets: np.ndarray, start: int) -> list[int]:
+    """
+    HierholzerWalkCSR is HierholzerWalk for a graph in CSR form. The cursor of each vertex is the index of its next
+    unused edge in targets, so the cursors are one list of integers.
+
+    Input:
+        offsets, targets: The graph. The edges out of vertex v go to targets[offsets[v]:offsets[v + 1]].
+        start: The vertex the walk starts from.
+
+    Output:
+        path: The walk, as a list of vertices.
+    """
+    cursors = offsets[:-1].tolist()
+    ends = offsets[1:].tolist()
+    targets = targets.tolist()
+    stack = []
+    path = []
+    vertex = start
+    while True:
+        edge = cursors[vertex]
+        if edge < ends[vertex]:
+            cursors[vertex] = edge + 1
+            stack.append(vertex)
+            vertex = targets[edge]
+        else:
+            path.append(vertex)
+            if not stack:
+                break
+            vertex = stack.pop()
+    path.reverse()
+    return path
         
 def InOutDegree(G: dict[int, list[int]]) -> tuple[dict[int, int], dict[int, int]]:
     """
-    InOutDegree: Determines the in and out degrees of all vertices in a graph.
+    InOutDegree: Determines the in and out degrees of all vertices in a graph. A DeBruijnGraph or a CachedDegreeGraph
+    already has its degrees, so they are returned as they are (numpy arrays indexed by node for a DeBruijnGraph).
+    Otherwise the out degrees are the lengths of the edge lists and the in degrees are counted in one pass over the
+    edges with a Counter.
 
     Input:
         G: A graph represnted as an adjacency list. The adjacency list is stored as a dictionary.
@@ -117,27 +159,68 @@ def InOutDegree(G: dict[int, list[int]]) -> tuple[dict[int, int], dict[int, int]
     Output:
         in_degree, out_degree: Two dictionaries that store the in and out degrees of each vertex in G.
     """
-    in_degree = {}
-    out_degree = {}
-    for key in G:
-        for val in G[key]:
-            if key in out_degree:
-                out_degree[key] += 1
-            else:
-                out_degree[key] = 1
-            
-            if val in in_degree:
-                in_degree[val] += 1
-            else:
-                in_degree[val] = 1
-
-            if key not in in_degree:
-                in_degree[key] = 0
-            if val not in out_degree:
-                out_degree[val] = 0
-                
+    if isinstance(G, (DeBruijnGraph, CachedDegreeGraph)):
+        return G.in_degree, G.out_degree
+    out_degree = {key: len(G[key]) for key in G}
+    in_counts = Counter(chain.from_iterable(G.values()))
+    in_degree = dict.fromkeys(out_degree, 0)
+    in_degree.update(in_counts)
+    for val in in_counts.keys() - out_degree.keys():
+        out_degree[val] = 0
     return in_degree, out_degree
 
+class CachedDegreeGraph(dict):
+    """
+    An adjacency dictionary that keeps the in and out degree of every vertex up to date as edges are added and
+    removed, so InOutDegree takes no time. Edges have to be changed with AddEdge and RemoveEdge (changing an edge
+    list directly is not seen by the degrees).
+
+    Properties:
+        in_degree: The in degree of every vertex.
+
+        out_degree: The out degree of every vertex.
+    """
+    def __init__(self, G: dict[int, list[int]] = None):
+        super().__init__()
+        self.in_degree = {}
+        self.out_degree = {}
+        if G is not None:
+            for key in G:
+                self.AddVertex(key)
+                for val in G[key]:
+                    self.AddEdge(key, val)
+
+    def AddVertex(self, vertex: int):
+        """
+        AddVertex adds a vertex with no edges (if it is not in the graph yet).
+        """
+        if vertex not in self:
+            self[vertex] = []
+        self.in_degree.setdefault(vertex, 0)
+        self.out_degree.setdefault(vertex, 0)
+
+    def AddEdge(self, source: int, target: int):
+        """
+        AddEdge adds an edge from source to target (after the other edges out of source). Like in the graphs built by
+        DeBruijnKmers, a vertex only gets a key once it has an edge out, but it has degrees as soon as it has an edge.
+        """
+        if source not in self:
+            self[source] = []
+        self[source].append(target)
+        self.out_degree[source] = self.out_degree.get(source, 0) + 1
+        self.in_degree[target] = self.in_degree.get(target, 0) + 1
+        self.in_degree.setdefault(source, 0)
+        self.out_degree.setdefault(target, 0)
+
+    def RemoveEdge(self, source: int, target: int):
+        """
+        RemoveEdge removes the first edge from source to target. Raises a ValueError if there is none.
+        """
+        if source not in self or target not in self[source]:
+            raise ValueError(f"There is no edge from {source} to {target}.")
+        self[source].remove(target)
+        self.out_degree[source] -= 1
+        self.in_degree[target] -= 1
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,248 @@
+import os, sys
+from glob import glob
+import numpy as np
+from DeBruijnGraph import *
+# SequenceReader is shared with Week11 rather than copied.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Week11 (Burrows Wheeler)"))
+from SequenceReader import ReadSequences
+
+CHUNK_BASES = 1 << 20 # Reads are encoded and counted in chunks of about this many bases.
+
+
+def main():
+    dirpath = os.path.join(os.path.dirname(__file__), "Files", "Inputs", "KmerCounting")
+    filepaths = sorted(glob(os.path.join(dirpath, "*")))
+    k = 21
+    codes, counts = CountKmers(filepaths, k, min_count=2, sketch_width=1 << 16)
+
+    answer_path = os.path.join(os.path.dirname(__file__), "KmerCounting.txt")
+    with open(answer_path, 'w') as f:
+        for k_mer, count in zip(DecodeKmers(codes, k), counts.tolist()):
+            f.write(f"{k_mer} {count}\n")
+
+
+class CountMinSketch:
+    """
+    A count-min sketch of k-mer codes: depth rows of width counters, and each code adds one to a counter in every row
+    (picked by a different multiply-shift hash). A code's estimate is its smallest counter. Estimates are never below
+    the true count, and are above it only when other codes collide with it in every row, so a sketch of fixed size
+    can tell which k-mers have been seen at least a few times.
+
+    Properties:
+        width: The number of counters in a row (a power of 2).
+
+        depth: The number of rows.
+
+        table: The counters (uint32, depth x width).
+
+        multipliers: The odd 64 bit multiplier of the hash of each row.
+    """
+    def __init__(self, width: int = 1 << 24, depth: int = 4, seed: int = 0):
+        if width < 2 or width & (width - 1):
+            raise ValueError("The width of a count-min sketch must be a power of 2.")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(0, 2**63, depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.shift = np.uint64(64 - (width.bit_length() - 1))
+
+    def Hashes(self, codes: np.ndarray, row: int) -> np.ndarray:
+        return ((codes * self.multipliers[row]) >> self.shift).astype(np.intp)
+
+    def Add(self, codes: np.ndarray):
+        """
+        Add counts every code once (a code that appears several times in codes is counted several times).
+        """
+        for row in range(self.depth):
+            counts = np.bincount(self.Hashes(codes, row), minlength=self.width)
+            np.minimum(self.table[row].astype(np.int64) + counts, np.iinfo(np.uint32).max, out=counts)
+            self.table[row] = counts
+
+    def Estimate(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Estimate returns an upper bound on the count of each code.
+        """
+        estimate = self.table[0][self.Hashes(codes, 0)]
+        for row in range(1, self.depth):
+            np.minimum(estimate, self.table[row][self.Hashes(codes, row)], out=estimate)
+        return estimate
+
+    def NumBytes(self) -> int:
+        return self.table.nbytes
+
+
+class KmerCounter:
+    """
+    Exact counts of k-mer codes, kept as a sorted array of the distinct codes and an array of their counts (12 bytes
+    per distinct k-mer). New codes are counted a chunk at a time and buffered, and the buffer is merged into the
+    table once it is as large as the table, so every code is merged O(log n) times.
+
+    Properties:
+        codes: The distinct codes merged so far, sorted (uint64).
+
+        counts: The count of each code (uint32).
+    """
+    def __init__(self):
+        self.codes = np.zeros(0, dtype=np.uint64)
+        self.counts = np.zeros(0, dtype=np.uint32)
+        self.buffer = []
+        self.buffer_size = 0
+
+    def Add(self, codes: np.ndarray):
+        """
+        Add counts every code once.
+        """
+        unique_codes, counts = np.unique(codes, return_counts=True)
+        self.buffer.append((unique_codes, counts))
+        self.buffer_size += len(unique_codes)
+        if self.buffer_size >= max(len(self.codes), CHUNK_BASES):
+            self.Merge()
+
+    def Merge(self):
+        if not self.buffer:
+            return
+        all_codes = np.concatenate([self.codes] + [codes for codes, _ in self.buffer])
+        all_counts = np.concatenate([self.counts] + [counts for _, counts in self.buffer])
+        self.codes, inverse = np.unique(all_codes, return_inverse=True)
+        counts = np.bincount(inverse.reshape(-1), weights=all_counts, minlength=len(self.codes))
+        self.counts = np.minimum(counts, np.iinfo(np.uint32).max).astype(np.uint32)
+        self.buffer = []
+        self.buffer_size = 0
+
+    def Counts(self, min_count: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Counts returns the codes that were seen at least min_count times, and their counts.
+        """
+        self.Merge()
+        keep = self.counts >= min_count
+        return self.codes[keep], self.counts[keep]
+
+    def NumBytes(self) -> int:
+        return self.codes.nbytes + self.counts.nbytes
+
+
+def ChunkSequences(sequences, chunk_bases: int = CHUNK_BASES):
+    """
+    ChunkSequences groups a stream of sequences into chunks of about chunk_bases bases, each joined into one string
+    with a character that is not a base between the sequences.
+    """
+    chunk = []
+    num_bases = 0
+    for sequence in sequences:
+        chunk.append(sequence)
+        num_bases += len(sequence) + 1
+        if num_bases >= chunk_bases:
+            yield "N".join(chunk)
+            chunk = []
+            num_bases = 0
+    if chunk:
+        yield "N".join(chunk)
+
+
+def CanonicalKmerCodes(text: str, k: int) -> np.ndarray:
+    """
+    CanonicalKmerCodes encodes every k-mer of a text (see EncodeKmers) as the smaller of its code and the code of
+    its reverse complement, so a k-mer and its reverse complement, which come from the two strands of the same DNA,
+    are counted together. The codes of all the windows are computed at once, one base position at a time.
+
+    Input:
+        text : The text. K-mers that contain a character other than A, C, G or T are skipped.
+        k : The length of the k-mers (at most 32).
+
+    Output:
+        codes : The canonical codes of the k-mers, in the order they appear in text.
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K} to encode k-mers in 64 bits.")
+    bases = DNA_CODES[np.frombuffer(text.encode("ascii", errors="replace"), dtype=np.uint8)]
+    num_windows = len(bases) - k + 1
+    if num_windows <= 0:
+        return np.zeros(0, dtype=np.uint64)
+    invalid = np.concatenate([[0], np.cumsum(bases < 0)])
+    valid = invalid[k:] == invalid[:-k] # The window has no invalid character.
+    bases = np.where(bases < 0, 0, bases).astype(np.uint64)
+
+    forward = np.zeros(num_windows, dtype=np.uint64)
+    reverse = np.zeros(num_windows, dtype=np.uint64)
+    for j in range(k):
+        window_bases = bases[j : j + num_windows]
+        forward = (forward << np.uint64(2)) | window_bases
+        reverse |= (np.uint64(3) - window_bases) << np.uint64(2 * j)
+    return np.minimum(forward, reverse)[valid]
+
+
+def ReverseComplementCodes(codes: np.ndarray, k: int) -> np.ndarray:
+    """
+    ReverseComplementCodes returns the codes of the reverse complements of k-mer codes.
+    """
+    codes = np.asarray(codes, dtype=np.uint64)
+    reverse = np.zeros(len(codes), dtype=np.uint64)
+    for j in range(k):
+        base = (codes >> np.uint64(2 * j)) & np.uint64(3)
+        reverse = (reverse << np.uint64(2)) | (np.uint64(3) - base)
+    return reverse
+
+
+def CountKmers(
+    filepaths: list[str], k: int, min_count: int = 2, sketch_width: int = 0, sketch_depth: int = 4
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    CountKmers streams the reads of FASTA/FASTQ files and counts their canonical k-mers, keeping the ones seen at
+    least min_count times. Most k-mers that contain a sequencing error are seen only once, so they are dropped here,
+    before any graph is built.
+
+    With a sketch_width, the reads are read twice. The first pass only fills a count-min sketch, and the second pass
+    counts exactly only the k-mers whose estimate is at least min_count, so the exact table never holds most of the
+    erroneous k-mers. Without it, every distinct k-mer is counted exactly in one pass.
+
+    Input:
+        filepaths : The FASTA/FASTQ files.
+        k : The length of the k-mers (at most 32).
+        min_count : The fewest times a k-mer has to be seen to be kept.
+        sketch_width : (Optional) The number of counters per row of the count-min sketch (a power of 2).
+        sketch_depth : The number of rows of the count-min sketch.
+
+    Output:
+        codes, counts : The sorted canonical codes of the kept k-mers and how many times each was seen.
+    """
+    def Chunks():
+        for filepath in filepaths:
+            sequences = (sequence.upper() for _, sequence in ReadSequences(filepath))
+            for chunk in ChunkSequences(sequences):
+                yield CanonicalKmerCodes(chunk, k)
+
+    sketch = None
+    if sketch_width and min_count > 1:
+        sketch = CountMinSketch(sketch_width, sketch_depth)
+        for codes in Chunks():
+            sketch.Add(codes)
+
+    counter = KmerCounter()
+    for codes in Chunks():
+        if sketch is not None:
+            codes = codes[sketch.Estimate(codes) >= min_count]
+        counter.Add(codes)
+    return counter.Counts(min_count)
+
+
+def SolidKmerGraph(filepaths: list[str], k: int, min_count: int = 2, sketch_width: int = 0) -> DeBruijnGraph:
+    """
+    SolidKmerGraph builds the de Bruijn graph of the k-mers of a set of reads that were seen at least min_count times
+    (on either strand). Both strands of every kept k-mer are added, since the reads come from both.
+
+    Input:
+        filepaths : The FASTA/FASTQ files.
+        k : The length of the k-mers (at most 32).
+        min_count : The fewest times a k-mer has to be seen to be kept.
+        sketch_width : (Optional) The width of the count-min sketch used by CountKmers.
+
+    Output:
+        G : The DeBruijnGraph of the kept k-mers and their reverse complements.
+    """
+    codes, _ = CountKmers(filepaths, k, min_count, sketch_width)
+    return DeBruijnGraph(np.union1d(codes, ReverseComplementCodes(codes, k)), k)
+
+
+if __name__ == "__main__":
+    main()
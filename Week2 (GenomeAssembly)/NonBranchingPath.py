@@ -1,6 +1,7 @@
 import os
 from glob import glob
 from Eulerian import *
+from UnitigGraph import UnitigGraph
 
 def main():
     dirpath = os.path.join(os.path.dirname(__file__),
@@ -32,6 +33,9 @@ def MaximalNonBranchingPaths(G: dict[int, list[int]]) -> list[list[int]]:
     Output:
         paths : The non-branching paths in a list. Each path is a list of vertices.
     """
+    if isinstance(G, DeBruijnGraph): # Find all the paths at once instead of walking them.
+        return UnitigGraph(G).NodePaths()
+
     traveled = {}
     in_degree, out_degree = InOutDegree(G)
     paths = []
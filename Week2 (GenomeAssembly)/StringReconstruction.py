@@ -1,6 +1,7 @@
 import os
 from glob import glob
 from DeBruijnKmers import *
+from DeBruijnGraph import *
 from Eulerian import *
 from GenomePath import *
 
@@ -26,6 +27,10 @@ def StringReconstruction(Patterns: list[str]) -> str:
     Output:
         Text: The reconstructed string.
     """
+    if IsDNAKmers(Patterns):
+        dB = BuildDeBruijnGraph(Patterns)
+        return dB.Spell(EulerianPath(dB))
+
     dB = DeBruijnKmers(Patterns)
     path = EulerianPath(dB)
     Text = GenomePath(path)
@@ -0,0 +1,168 @@
+import os
+from glob import glob
+import numpy as np
+from DeBruijnGraph import *
+
+
+def main():
+    dirpath = os.path.join(os.path.dirname(__file__), "Files", "Inputs", "ContigGeneration")
+    filepaths = sorted(glob(os.path.join(dirpath, "*.txt")))
+    k_mers_lists = [ReadTests_DeBruijnKmers(filepath) for filepath in filepaths]
+    k_mers = next(k_mers for k_mers in k_mers_lists if IsDNAKmers(k_mers)) # The first test with k <= 32.
+    unitigs = UnitigGraph(BuildDeBruijnGraph(k_mers))
+
+    answer_path = os.path.join(os.path.dirname(__file__), "UnitigGraph.txt")
+    with open(answer_path, 'w') as f:
+        f.write(" ".join(unitigs.Unitigs()))
+
+
+class UnitigGraph:
+    """
+    The unitigs (maximal non-branching paths) of a DeBruijnGraph, found for all edges at once instead of by walking
+    each path. Inside a unitig every node has one edge in and one edge out, so every edge has at most one edge
+    before it in its unitig (the edge into its source, if the source is such a node). Pointer jumping on that link
+    finds the first edge of each edge's unitig and its position there in O(log L) numpy passes over the edges, where
+    L is the longest unitig. Unitigs where every node has one edge in and one out are isolated cycles. They are
+    found as the edges that never reach a first edge, and are cut open at their smallest edge.
+
+    The sequences of the unitigs are stored once, one after the other in a single array.
+
+    Properties:
+        graph: The DeBruijnGraph.
+
+        k: The length of the k-mers.
+
+        num_unitigs: The number of unitigs.
+
+        sequence: The letters of all the unitigs, one after the other (ascii codes, uint8).
+
+        starts: Unitig i is sequence[starts[i]:starts[i + 1]].
+
+        is_cycle: Whether each unitig is an isolated cycle (which ends with the same k - 1 letters it starts with).
+
+        edge_unitig: The unitig of each edge of the graph.
+
+        edge_order: The edges of the graph grouped by unitig, in order along each unitig.
+
+        first_nodes: The first node of each unitig.
+    """
+    def __init__(self, G: DeBruijnGraph):
+        self.graph = G
+        self.k = G.k
+        num_edges = G.NumEdges()
+        sources = np.repeat(np.arange(len(G), dtype=np.int64), G.out_degree)
+        targets = G.targets.astype(np.int64)
+        is_inner = (G.in_degree == 1) & (G.out_degree == 1) # Nodes inside unitigs.
+
+        edge_into = np.full(len(G), -1, dtype=np.int64)
+        edge_into[targets] = np.arange(num_edges)
+        previous = np.where(is_inner[sources], edge_into[sources], -1) # The edge before each edge in its unitig.
+
+        first_edge, position = FirstEdges(previous)
+        in_cycle = previous[first_edge] >= 0
+        if in_cycle.any(): # Cut every isolated cycle open before its smallest edge and rank again.
+            cycle_edges = np.flatnonzero(in_cycle)
+            previous[SmallestInCycle(previous, cycle_edges)] = -1
+            first_edge, position = FirstEdges(previous)
+
+        # Unitigs are numbered by their first edge, paths before cycles.
+        unitig_keys = np.where(in_cycle, first_edge + num_edges, first_edge)
+        unitig_keys, self.edge_unitig, lengths = np.unique(unitig_keys, return_inverse=True, return_counts=True)
+        self.edge_unitig = self.edge_unitig.reshape(-1)
+        self.num_unitigs = len(unitig_keys)
+        self.is_cycle = unitig_keys >= num_edges
+        first_edges = np.where(self.is_cycle, unitig_keys - num_edges, unitig_keys)
+        self.edge_order = np.lexsort((position, self.edge_unitig))
+
+        # A unitig of m edges is the k - 1 letters of its first node, then the last letter of each edge's target.
+        self.starts = np.zeros(self.num_unitigs + 1, dtype=np.int64)
+        np.cumsum(lengths + self.k - 1, out=self.starts[1:])
+        self.sequence = np.empty(self.starts[-1], dtype=np.uint8)
+        first_nodes = G.nodes[sources[first_edges]]
+        for j in range(self.k - 1):
+            shift = np.uint64(2 * (self.k - 2 - j))
+            self.sequence[self.starts[:-1] + j] = DNA_LETTERS[((first_nodes >> shift) & np.uint64(3)).astype(np.intp)]
+        last_letters = DNA_LETTERS[(G.nodes[targets] & np.uint64(3)).astype(np.intp)]
+        self.sequence[self.starts[self.edge_unitig] + self.k - 1 + position] = last_letters
+        self.first_nodes = sources[first_edges]
+
+    def Unitig(self, i: int) -> str:
+        """
+        Unitig returns the sequence of unitig i.
+        """
+        return self.sequence[self.starts[i] : self.starts[i + 1]].tobytes().decode("ascii")
+
+    def Unitigs(self) -> list[str]:
+        """
+        Unitigs returns the sequences of all the unitigs: the paths, then the isolated cycles, each in the order of
+        their first edges.
+        """
+        text = self.sequence.tobytes().decode("ascii")
+        starts = self.starts.tolist()
+        return [text[starts[i] : starts[i + 1]] for i in range(self.num_unitigs)]
+
+    def NodePaths(self) -> list[list[int]]:
+        """
+        NodePaths returns each unitig as a path of node numbers, like MaximalNonBranchingPaths does.
+        """
+        nodes = self.graph.targets[self.edge_order].tolist()
+        ends = np.cumsum(self.starts[1:] - self.starts[:-1] - (self.k - 1)).tolist()
+        paths = []
+        start = 0
+        for first_node, end in zip(self.first_nodes.tolist(), ends):
+            paths.append([first_node] + nodes[start:end])
+            start = end
+        return paths
+
+    def NumBytes(self) -> int:
+        """
+        NumBytes returns the memory used by the unitig arrays.
+        """
+        arrays = [self.sequence, self.starts, self.is_cycle, self.edge_unitig, self.edge_order, self.first_nodes]
+        return sum(arr.nbytes for arr in arrays)
+
+
+def FirstEdges(previous: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    FirstEdges follows the links from every edge to the edge before it, by pointer jumping: after round r each edge
+    points 2^r edges back (or to the first edge of its path), so ceil(log2(E)) rounds reach every first edge.
+
+    Input:
+        previous : The edge before each edge, or -1 for the first edge of a path.
+
+    Output:
+        first_edge, position : The first edge each edge's path reaches in that many rounds, and how many edges
+            before it that is. The first edge of an edge on a cycle still has an edge before it.
+    """
+    num_edges = len(previous)
+    has_previous = previous >= 0
+    jump = np.where(has_previous, previous, np.arange(num_edges))
+    position = has_previous.astype(np.int64)
+    for _ in range(max(num_edges - 1, 1).bit_length()):
+        position += position[jump]
+        jump = jump[jump]
+    return jump, position
+
+
+def SmallestInCycle(previous: np.ndarray, cycle_edges: np.ndarray) -> np.ndarray:
+    """
+    SmallestInCycle finds the smallest edge of every cycle, with pointer jumping on the minimum edge seen so far.
+
+    Input:
+        previous : The edge before each edge (never -1 for edges on cycles).
+        cycle_edges : The edges that are on cycles.
+
+    Output:
+        The smallest edge of each cycle.
+    """
+    smallest = np.arange(len(previous))
+    jump = previous.copy()
+    jump[previous < 0] = np.flatnonzero(previous < 0)
+    for _ in range(max(len(previous) - 1, 1).bit_length()):
+        np.minimum(smallest, smallest[jump], out=smallest)
+        jump = jump[jump]
+    return np.unique(smallest[cycle_edges])
+
+
+if __name__ == "__main__":
+    main()